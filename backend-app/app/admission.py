@@ -0,0 +1,261 @@
+"""Admission control for the item routes.
+
+Each class of item request (``read`` for GET/HEAD, ``write`` for the rest)
+may run ``ADMISSION_READ_LIMIT`` / ``ADMISSION_WRITE_LIMIT`` requests at a
+time, sized so admitted requests find a free database connection. Further
+requests wait in a FIFO queue of ``ADMISSION_QUEUE_SIZE`` places for at most
+``ADMISSION_MAX_WAIT_MS``, or until their deadline: clients can send
+``X-Request-Timeout-Ms`` with the time they are willing to wait for a response.
+
+Requests that find the queue full, or are still queued at their deadline,
+get an immediate ``503`` with ``Retry-After`` instead of piling up on the
+connection pool for work nobody will receive.
+
+The deadline also bounds the work of admitted requests: no SQL statement is
+started after it, and on PostgreSQL each transaction gets the remaining time
+as its ``statement_timeout``. A request stopped that way is answered with
+``503`` as well, if its response has not started yet.
+"""
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.metrics import ADMISSION_IN_FLIGHT, ADMISSION_QUEUED, ADMISSION_QUEUE_WAIT, ADMISSION_REJECTIONS
+
+ADMISSION_CONTROL_ENABLED = os.getenv("ADMISSION_CONTROL_ENABLED", "true").lower() == "true"
+
+# Concurrent requests per class; together they match the primary pool
+# (pool_size 5 + max_overflow 10) by default
+ADMISSION_READ_LIMIT = int(os.getenv("ADMISSION_READ_LIMIT", "10"))
+ADMISSION_WRITE_LIMIT = int(os.getenv("ADMISSION_WRITE_LIMIT", "5"))
+
+# Requests waiting per class, and the longest wait without a client deadline
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "50"))
+ADMISSION_MAX_WAIT_MS = float(os.getenv("ADMISSION_MAX_WAIT_MS", "2000"))
+
+# Seconds clients are asked to wait before retrying a rejected request
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "1"))
+
+DEADLINE_HEADER = "x-request-timeout-ms"
+
+# Routes subject to admission control; the change feed holds no database
+# connection and stays open for minutes, so it is not limited
+ADMISSION_PATH_PREFIX = "/items"
+EXEMPT_PATHS = frozenset({"/items/changes"})
+
+READ_METHODS = frozenset({"GET", "HEAD"})
+
+# SQLSTATE of statements cancelled by PostgreSQL's statement_timeout
+QUERY_CANCELED = "57014"
+
+# Largest statement_timeout PostgreSQL accepts (milliseconds, a 32-bit integer)
+MAX_STATEMENT_TIMEOUT_MS = 2**31 - 1
+
+
+class DeadlineExceeded(Exception):
+    """A request's deadline passed before one of its SQL statements could start."""
+
+
+# Monotonic deadline of the request being handled, if its client sent one
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    deadline = _deadline.get()
+    if deadline is None:
+        return
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise DeadlineExceeded()
+    if conn.dialect.name != "postgresql":
+        return
+    # SET LOCAL lasts until the end of the transaction, so apply it once per transaction
+    transaction = conn.get_transaction()
+    if conn.info.get("deadline_transaction") is not transaction:
+        conn.info["deadline_transaction"] = transaction
+        timeout_ms = min(max(1, int(remaining * 1000)), MAX_STATEMENT_TIMEOUT_MS)
+        cursor.execute(f"SET LOCAL statement_timeout = {timeout_ms}")
+
+
+def _is_deadline_error(exc: Exception) -> bool:
+    """Whether ``exc`` stopped a request because its deadline passed."""
+    if isinstance(exc, DeadlineExceeded):
+        return True
+    if isinstance(exc, DBAPIError):
+        orig = exc.orig
+        # psycopg2 and asyncpg name the SQLSTATE differently
+        return QUERY_CANCELED in (getattr(orig, "pgcode", None), getattr(orig, "sqlstate", None))
+    return False
+
+
+class Limiter:
+    """Concurrency limit with a bounded FIFO wait queue, for one event loop."""
+    
+    def __init__(self, name: str, limit: int, queue_size: int):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.active = 0
+        self._waiters: deque[asyncio.Future] = deque()
+    
+    async def acquire(self, timeout: float) -> Optional[str]:
+        """
+        Take a slot, waiting up to ``timeout`` seconds in the queue.
+        
+        Returns ``None`` once admitted, or the reason for rejecting the request
+        (``queue_full`` or ``timeout``).
+        """
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return None
+        if len(self._waiters) >= self.queue_size:
+            return "queue_full"
+        if timeout <= 0:
+            return "timeout"
+        
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        ADMISSION_QUEUED.labels(self.name).inc()
+        try:
+            # Resolved by release(), which hands its slot over
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            self._discard(waiter)
+            return "timeout"
+        except asyncio.CancelledError:
+            # The client went away while queued
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                self._discard(waiter)
+            raise
+        finally:
+            ADMISSION_QUEUED.labels(self.name).dec()
+        return None
+    
+    def release(self) -> None:
+        """Free a slot, handing it to the longest-waiting request if any."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+    
+    def _discard(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+
+def _request_deadline(headers: Headers, start: float) -> Optional[float]:
+    """
+    Monotonic time by which the client wants its response.
+    
+    Returns ``None`` without a deadline, or when the header is not a finite,
+    positive number of milliseconds.
+    """
+    value = headers.get(DEADLINE_HEADER)
+    if value is None:
+        return None
+    try:
+        timeout_ms = float(value)
+    except ValueError:
+        return None
+    if not math.isfinite(timeout_ms) or timeout_ms <= 0:
+        return None
+    return start + timeout_ms / 1000
+
+
+def _timeout(deadline: Optional[float]) -> float:
+    """Seconds a request may wait in the queue: its remaining deadline, capped by ``ADMISSION_MAX_WAIT_MS``."""
+    timeout = ADMISSION_MAX_WAIT_MS / 1000
+    if deadline is not None:
+        timeout = min(timeout, deadline - time.monotonic())
+    return timeout
+
+
+def _busy_response() -> JSONResponse:
+    return JSONResponse(
+        {"detail": "Server is busy, retry later"},
+        status_code=503,
+        headers={"Retry-After": str(ADMISSION_RETRY_AFTER)}
+    )
+
+
+class AdmissionControlMiddleware:
+    """Limit concurrent item requests per class and shed load beyond a bounded queue."""
+    
+    def __init__(
+        self,
+        app: ASGIApp,
+        read_limit: int = ADMISSION_READ_LIMIT,
+        write_limit: int = ADMISSION_WRITE_LIMIT,
+        queue_size: int = ADMISSION_QUEUE_SIZE
+    ):
+        self.app = app
+        self.limiters = {
+            "read": Limiter("read", read_limit, queue_size),
+            "write": Limiter("write", write_limit, queue_size),
+        }
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+        if (
+            scope["type"] != "http"
+            or scope["method"] == "OPTIONS"
+            or not path.startswith(ADMISSION_PATH_PREFIX)
+            or path.rstrip("/") in EXEMPT_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
+        
+        start = time.monotonic()
+        deadline = _request_deadline(Headers(scope=scope), start)
+        limiter = self.limiters["read" if scope["method"] in READ_METHODS else "write"]
+        rejection = await limiter.acquire(_timeout(deadline))
+        ADMISSION_QUEUE_WAIT.labels(limiter.name).observe(time.monotonic() - start)
+        if rejection is not None:
+            ADMISSION_REJECTIONS.labels(limiter.name, rejection).inc()
+            await _busy_response()(scope, receive, send)
+            return
+        
+        response_started = False
+        
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+        
+        ADMISSION_IN_FLIGHT.labels(limiter.name).inc()
+        token = _deadline.set(deadline)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as exc:
+            if response_started or not _is_deadline_error(exc):
+                raise
+            ADMISSION_REJECTIONS.labels(limiter.name, "deadline").inc()
+            await _busy_response()(scope, receive, send)
+        finally:
+            _deadline.reset(token)
+            ADMISSION_IN_FLIGHT.labels(limiter.name).dec()
+            limiter.release()
+
+
+def install(app) -> None:
+    """Register the admission middleware and the deadline check on SQL statements if enabled."""
+    if not ADMISSION_CONTROL_ENABLED:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    app.add_middleware(AdmissionControlMiddleware)
@@ -0,0 +1,92 @@
+"""Cache backends."""
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class CacheBackend(ABC):
+    """Interface for caches used by the application.
+    
+    Implement it to plug in a shared cache (e.g. Redis or memcached) so that
+    all workers see the same entries and invalidations. Values may be
+    arbitrary Python objects; backends outside the process are responsible
+    for serializing them.
+    """
+    
+    @abstractmethod
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if it is missing or expired."""
+    
+    @abstractmethod
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value."""
+    
+    @abstractmethod
+    def delete(self, key: Hashable) -> None:
+        """Remove a single entry if present."""
+    
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all entries."""
+
+
+class NullCache(CacheBackend):
+    """Cache that stores nothing, used when caching is disabled."""
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        return None
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        pass
+    
+    def delete(self, key: Hashable) -> None:
+        pass
+    
+    def clear(self) -> None:
+        pass
+
+
+class TTLCache(CacheBackend):
+    """Thread-safe in-process LRU cache whose entries expire after a fixed time-to-live."""
+    
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry when full."""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def delete(self, key: Hashable) -> None:
+        """Remove a single entry if present."""
+        with self._lock:
+            self._data.pop(key, None)
+    
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+    
+    def __len__(self) -> int:
+        return len(self._data)
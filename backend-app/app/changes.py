@@ -0,0 +1,409 @@
+"""Live feed of item changes.
+
+The CRUD write functions record a ``created``, ``updated`` or ``deleted``
+event per affected item with :func:`notify`, inside the writing transaction.
+Committed events reach the process-wide :data:`broker`, which keeps the last
+``CHANGE_FEED_BUFFER_SIZE`` of them and fans them out to the
+``GET /items/changes`` Server-Sent Events streams.
+
+On PostgreSQL, events are sent with ``NOTIFY`` and every worker receives them
+on a ``LISTEN`` connection, so each stream sees the writes of all workers and
+event IDs are the same everywhere. Elsewhere (SQLite), events are published
+in-process when the session commits and only reach streams of that worker.
+
+Writes touching more than ``CHANGE_FEED_MAX_EVENTS`` items and COPY loads
+send a single ``reset`` event instead, telling clients to refetch. So does a
+resume from a ``Last-Event-ID`` that is no longer buffered.
+"""
+import asyncio
+import logging
+import os
+import select
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Optional, Sequence
+import orjson
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session, SessionTransaction
+from sqlalchemy.pool import NullPool
+from app import models, schemas
+from app.database import DATABASE_URL, SessionLocal, engine
+from app.metrics import CHANGE_FEED_EVENTS, CHANGE_FEED_OVERFLOWS, CHANGE_FEED_SUBSCRIBERS
+
+logger = logging.getLogger(__name__)
+
+# Recent events kept for resuming streams, and events queued per stream
+# before a client that does not keep up is disconnected
+CHANGE_FEED_BUFFER_SIZE = int(os.getenv("CHANGE_FEED_BUFFER_SIZE", "1000"))
+CHANGE_FEED_QUEUE_SIZE = int(os.getenv("CHANGE_FEED_QUEUE_SIZE", "256"))
+
+# Writes touching more items send one reset event instead of an event per item
+CHANGE_FEED_MAX_EVENTS = int(os.getenv("CHANGE_FEED_MAX_EVENTS", "100"))
+
+# Seconds between keep-alive comments, and before a stream is closed so the
+# client reconnects (with Last-Event-ID), possibly to another worker
+CHANGE_FEED_HEARTBEAT_SECONDS = float(os.getenv("CHANGE_FEED_HEARTBEAT_SECONDS", "15"))
+CHANGE_FEED_MAX_STREAM_SECONDS = float(os.getenv("CHANGE_FEED_MAX_STREAM_SECONDS", "300"))
+
+# Reconnection delay suggested to clients
+CHANGE_FEED_RETRY_MS = int(os.getenv("CHANGE_FEED_RETRY_MS", "2000"))
+
+# Share events between workers with LISTEN/NOTIFY on PostgreSQL
+CHANGE_FEED_PG_NOTIFY = os.getenv("CHANGE_FEED_PG_NOTIFY", "true").lower() == "true"
+
+CHANNEL = "item_changes"
+
+# PostgreSQL rejects NOTIFY payloads of 8000 bytes or more
+NOTIFY_PAYLOAD_LIMIT = 7999
+
+NOTIFY_STATEMENT = text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload")
+
+# Session.info key of events waiting for their transaction (or savepoint) to commit
+PENDING_KEY = "pending_changes"
+
+# Item attributes in response order
+ITEM_FIELDS = tuple(schemas.ItemResponse.model_fields)
+
+
+class ChangeEvent:
+    """One change event, encoded once as an SSE message for all streams."""
+    
+    __slots__ = ("id", "event", "data", "message")
+    
+    def __init__(self, event_id: str, event_type: str, data: str):
+        self.id = event_id
+        self.event = event_type
+        self.data = data
+        self.message = f"id: {event_id}\nevent: {event_type}\ndata: {data}\n\n".encode()
+
+
+_id_lock = threading.Lock()
+_last_id_micros = 0
+# Keeps IDs of events created by different processes in the same microsecond apart
+_process_token = os.urandom(2).hex()
+
+
+def _next_event_id() -> str:
+    """Unique event ID; IDs increase within a process but are opaque to clients."""
+    global _last_id_micros
+    with _id_lock:
+        _last_id_micros = max(_last_id_micros + 1, time.time_ns() // 1000)
+        return f"{_last_id_micros}-{_process_token}"
+
+
+def _event_data(event_type: str, row) -> str:
+    """JSON data of an event about the item ``row``, matching ``ItemResponse``."""
+    if event_type == "deleted":
+        return orjson.dumps({"id": row.id}).decode()
+    item = {name: getattr(row, name) for name in ITEM_FIELDS}
+    item["sum"] = str(item["sum"])
+    return orjson.dumps(item, option=orjson.OPT_UTC_Z).decode()
+
+
+def _reset_event(event_id: Optional[str] = None) -> ChangeEvent:
+    return ChangeEvent(event_id if event_id is not None else _next_event_id(), "reset", "{}")
+
+
+def _notify_payload(change: ChangeEvent, item_id: Optional[int]) -> str:
+    """
+    NOTIFY payload for an event.
+    
+    Payloads over the size limit (long descriptions) carry the item ID
+    instead of its data, and listeners load the item themselves.
+    """
+    payload = f"{change.id}\n{change.event}\n{change.data}"
+    if len(payload.encode()) > NOTIFY_PAYLOAD_LIMIT and item_id is not None:
+        payload = f"{change.id}\n{change.event}\n@{item_id}"
+    return payload
+
+
+def _uses_notify(db: Session) -> bool:
+    return CHANGE_FEED_PG_NOTIFY and db.get_bind().dialect.name == "postgresql"
+
+
+def notify(db: Session, event_type: str, rows: Sequence = ()) -> None:
+    """
+    Record change events for the item ``rows`` in ``db``'s current transaction.
+    
+    Events are only published if the transaction commits. Call it inside a
+    savepoint to drop the events along with a rolled-back savepoint.
+    ``event_type`` ``reset`` takes no rows.
+    """
+    if event_type == "reset" or len(rows) > CHANGE_FEED_MAX_EVENTS:
+        changes = [(_reset_event(), None)]
+    else:
+        changes = [(ChangeEvent(_next_event_id(), event_type, _event_data(event_type, row)), row.id) for row in rows]
+    if not changes:
+        return
+    
+    if _uses_notify(db):
+        db.execute(NOTIFY_STATEMENT, {
+            "channel": CHANNEL,
+            "payloads": [_notify_payload(change, item_id) for change, item_id in changes],
+        })
+    else:
+        transaction = _current_transaction(db)
+        if transaction is None:
+            # Autobegin, so the events belong to the transaction the caller commits
+            db.connection()
+            transaction = db.get_transaction()
+        pending = db.info.setdefault(PENDING_KEY, {})
+        pending.setdefault(transaction, []).extend(change for change, _ in changes)
+
+
+def _current_transaction(session: Session) -> Optional[SessionTransaction]:
+    """The innermost transaction of ``session``: its current savepoint, if any."""
+    return session.get_nested_transaction() or session.get_transaction()
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending(session: Session) -> None:
+    pending = session.info.get(PENDING_KEY)
+    if not pending:
+        return
+    # Fired for released savepoints too, while they are still the innermost transaction
+    transaction = _current_transaction(session)
+    changes = pending.pop(transaction, None)
+    if not changes:
+        return
+    if transaction.parent is not None:
+        # A released savepoint: its events now depend on the enclosing transaction
+        pending.setdefault(transaction.parent, []).extend(changes)
+    else:
+        broker.publish(changes)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_pending(session: Session, transaction: SessionTransaction) -> None:
+    # Events still held by an ending transaction were not committed: it was
+    # rolled back (a savepoint or the whole transaction) or closed
+    pending = session.info.get(PENDING_KEY)
+    if pending is None:
+        return
+    if transaction.parent is None:
+        session.info.pop(PENDING_KEY, None)
+    else:
+        pending.pop(transaction, None)
+
+
+class Subscription:
+    """Bounded queue of events for one stream."""
+    
+    def __init__(self, maxsize: int):
+        self.queue: asyncio.Queue[ChangeEvent] = asyncio.Queue(maxsize)
+        # Set when the queue was full; the stream then ends after the queued events
+        self.overflowed = False
+    
+    def put(self, change: ChangeEvent) -> None:
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(change)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            CHANGE_FEED_OVERFLOWS.inc()
+
+
+def _deliver(subscriptions: tuple[Subscription, ...], changes: list[ChangeEvent]) -> None:
+    for subscription in subscriptions:
+        for change in changes:
+            subscription.put(change)
+
+
+class ChangeBroker:
+    """Buffers recent change events and fans them out to the streams of this process."""
+    
+    def __init__(self, buffer_size: int = CHANGE_FEED_BUFFER_SIZE, queue_size: int = CHANGE_FEED_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._buffer: deque[ChangeEvent] = deque(maxlen=buffer_size)
+        self._subscriptions: set[Subscription] = set()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Deliver events to streams served by ``loop``."""
+        self._loop = loop
+    
+    def stop(self) -> None:
+        self._loop = None
+    
+    def publish(self, changes: list[ChangeEvent]) -> None:
+        """Buffer committed events and hand them to every stream; safe to call from any thread."""
+        with self._lock:
+            self._buffer.extend(changes)
+            if self._loop is not None and self._subscriptions:
+                try:
+                    # Scheduled under the lock, so streams receive events in publishing order
+                    self._loop.call_soon_threadsafe(_deliver, tuple(self._subscriptions), changes)
+                except RuntimeError:
+                    # The event loop closed during shutdown
+                    pass
+        for change in changes:
+            CHANGE_FEED_EVENTS.labels(change.event).inc()
+    
+    def subscribe(self, last_event_id: Optional[str] = None) -> tuple[Subscription, list[ChangeEvent]]:
+        """
+        Register a stream, returning its subscription and the buffered events after ``last_event_id``.
+        
+        If ``last_event_id`` is no longer (or was never) buffered, the backlog
+        is a single ``reset`` event.
+        """
+        subscription = Subscription(self.queue_size)
+        with self._lock:
+            backlog = self._since(last_event_id) if last_event_id else []
+            self._subscriptions.add(subscription)
+        CHANGE_FEED_SUBSCRIBERS.inc()
+        return subscription, backlog
+    
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+        CHANGE_FEED_SUBSCRIBERS.dec()
+    
+    def _since(self, last_event_id: str) -> list[ChangeEvent]:
+        buffered = list(self._buffer)
+        for index in range(len(buffered) - 1, -1, -1):
+            if buffered[index].id == last_event_id:
+                return buffered[index + 1:]
+        # Resume from the newest buffered event after refetching
+        return [_reset_event(buffered[-1].id if buffered else "")]
+    
+    async def stream(self, last_event_id: Optional[str] = None) -> AsyncIterator[bytes]:
+        """
+        Server-Sent Events for one client: missed events after ``last_event_id``, then live ones.
+        
+        Sends a keep-alive comment when idle. The stream ends after
+        ``CHANGE_FEED_MAX_STREAM_SECONDS`` or once the client falls
+        ``queue_size`` events behind; the client then reconnects and resumes.
+        """
+        subscription, backlog = self.subscribe(last_event_id)
+        try:
+            yield f"retry: {CHANGE_FEED_RETRY_MS}\n\n".encode()
+            if backlog:
+                yield b"".join(change.message for change in backlog)
+            
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + CHANGE_FEED_MAX_STREAM_SECONDS
+            queue = subscription.queue
+            while True:
+                if subscription.overflowed and queue.empty():
+                    return
+                timeout = min(CHANGE_FEED_HEARTBEAT_SECONDS, deadline - loop.time())
+                if timeout <= 0:
+                    return
+                try:
+                    change = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+                # Send everything already queued in one write
+                messages = [change.message]
+                while not queue.empty():
+                    messages.append(queue.get_nowait().message)
+                yield b"".join(messages)
+        finally:
+            self.unsubscribe(subscription)
+
+
+broker = ChangeBroker()
+
+
+def _load_event(event_id: str, event_type: str, item_id: int) -> Optional[ChangeEvent]:
+    """Rebuild an event whose item was too large for its NOTIFY payload."""
+    table = models.Item.__table__
+    with SessionLocal() as db:
+        row = db.execute(table.select().where(table.c.id == item_id)).first()
+    if row is None:
+        # Deleted since; its deleted event follows
+        return None
+    return ChangeEvent(event_id, event_type, _event_data(event_type, row))
+
+
+class NotificationListener:
+    """Receives the events every worker sends with ``NOTIFY`` and publishes them to the local broker."""
+    
+    def __init__(self, url: str = DATABASE_URL, target: ChangeBroker = broker, reconnect_delay: float = 1.0):
+        self.url = url
+        self.target = target
+        self.reconnect_delay = reconnect_delay
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self) -> None:
+        """Start the listener thread."""
+        self._thread = threading.Thread(target=self._run, name="change-feed-listener", daemon=True)
+        self._thread.start()
+    
+    def stop(self) -> None:
+        """Stop the listener thread."""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join(timeout=5)
+        self._thread = None
+    
+    def _run(self) -> None:
+        # A dedicated connection outside the request pool, held for the process lifetime
+        listen_engine = create_engine(self.url, poolclass=NullPool)
+        connected_before = False
+        while not self._stopping.is_set():
+            try:
+                connection = listen_engine.raw_connection()
+            except Exception as e:
+                logger.warning("Change feed cannot connect to LISTEN: %s", e)
+                self._stopping.wait(self.reconnect_delay)
+                continue
+            try:
+                dbapi_connection = connection.driver_connection
+                dbapi_connection.autocommit = True
+                with dbapi_connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {CHANNEL}")
+                if connected_before:
+                    # Events sent while disconnected were missed
+                    self.target.publish([_reset_event()])
+                connected_before = True
+                while not self._stopping.is_set():
+                    readable, _, _ = select.select([dbapi_connection], [], [], 1.0)
+                    if not readable:
+                        continue
+                    dbapi_connection.poll()
+                    changes = [self._parse(notification.payload) for notification in dbapi_connection.notifies]
+                    dbapi_connection.notifies.clear()
+                    changes = [change for change in changes if change is not None]
+                    if changes:
+                        self.target.publish(changes)
+            except Exception:
+                logger.exception("Change feed LISTEN connection failed")
+                self._stopping.wait(self.reconnect_delay)
+            finally:
+                connection.invalidate()
+        listen_engine.dispose()
+    
+    @staticmethod
+    def _parse(payload: str) -> Optional[ChangeEvent]:
+        event_id, event_type, data = payload.split("\n", 2)
+        if data.startswith("@"):
+            return _load_event(event_id, event_type, int(data[1:]))
+        return ChangeEvent(event_id, event_type, data)
+
+
+listener: Optional[NotificationListener] = None
+
+
+def start() -> None:
+    """Start delivering events to streams of the running event loop, listening on PostgreSQL."""
+    global listener
+    broker.start(asyncio.get_running_loop())
+    if CHANGE_FEED_PG_NOTIFY and engine.dialect.name == "postgresql" and listener is None:
+        listener = NotificationListener()
+        listener.start()
+
+
+def stop() -> None:
+    """Stop the listener and event delivery."""
+    global listener
+    if listener is not None:
+        listener.stop()
+        listener = None
+    broker.stop()
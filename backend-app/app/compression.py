@@ -0,0 +1,190 @@
+"""Negotiated response compression.
+
+Responses of at least ``COMPRESSION_MIN_SIZE`` bytes are compressed with the
+best encoding listed in the client's ``Accept-Encoding``: zstd and brotli when
+their optional packages (``zstandard``, ``brotli``) are installed, otherwise
+gzip. Streamed responses are compressed chunk by chunk; event streams are
+passed through untouched so events are not held back in compressor buffers.
+"""
+import os
+import zlib
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+
+# Smaller responses are sent as is: compressing them saves little and costs CPU
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+
+# Levels favour speed: these are per-request costs on the API's hot path
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3"))
+
+# Content types that must reach the client as soon as they are written
+UNBUFFERED_CONTENT_TYPES = ("text/event-stream",)
+
+
+class _GzipCompressor:
+    def __init__(self):
+        # wbits=31: zlib stream with a gzip header and trailer
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+    
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliCompressor:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+    
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdCompressor:
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+    
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+    
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+# Supported encodings in order of preference
+COMPRESSORS = {
+    name: compressor
+    for name, compressor, available in (
+        ("zstd", _ZstdCompressor, zstandard is not None),
+        ("br", _BrotliCompressor, brotli is not None),
+        ("gzip", _GzipCompressor, True),
+    )
+    if available
+}
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick the preferred supported encoding from an ``Accept-Encoding`` value.
+    
+    Encodings with ``q=0`` are refused; ``*`` stands for any encoding not
+    listed explicitly. Returns ``None`` when nothing supported is accepted.
+    """
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        weight = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name] = weight
+    
+    wildcard = weights.get("*", 0.0)
+    candidates = [(weights.get(name, wildcard), name) for name in COMPRESSORS]
+    # Highest weight wins; ties go to the encoding listed first in COMPRESSORS
+    weight, name = max(candidates, key=lambda candidate: candidate[0], default=(0.0, None))
+    return name if weight > 0 else None
+
+
+class CompressionMiddleware:
+    """Compress response bodies according to the request's ``Accept-Encoding``."""
+    
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        
+        start_message: Optional[Message] = None
+        compressor = None
+        passthrough = False
+        
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, compressor, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                # Held back until the first body chunk shows whether to compress
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            
+            if compressor is None:
+                start, start_message = start_message, None
+                headers = MutableHeaders(raw=start["headers"])
+                body = message.get("body", b"")
+                more_body = message.get("more_body", False)
+                content_type = headers.get("content-type", "")
+                skip = (
+                    "content-encoding" in headers
+                    or content_type.startswith(UNBUFFERED_CONTENT_TYPES)
+                    or (not more_body and len(body) < self.minimum_size)
+                )
+                if skip:
+                    if not content_type.startswith(UNBUFFERED_CONTENT_TYPES):
+                        headers.add_vary_header("Accept-Encoding")
+                    await send(start)
+                    await send(message)
+                    passthrough = True
+                    return
+                
+                compressor = COMPRESSORS[encoding]()
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if more_body:
+                    del headers["Content-Length"]
+                    await send(start)
+                    await send({**message, "body": compressor.compress(body)})
+                else:
+                    compressed = compressor.compress(body) + compressor.finish()
+                    headers["Content-Length"] = str(len(compressed))
+                    await send(start)
+                    await send({**message, "body": compressed})
+                return
+            
+            body = compressor.compress(message.get("body", b""))
+            if not message.get("more_body", False):
+                body += compressor.finish()
+            await send({**message, "body": body})
+        
+        await self.app(scope, receive, send_compressed)
+        if start_message is not None:
+            # The app ended the response without a body message
+            await send(start_message)
@@ -0,0 +1,48 @@
+"""HTTP validators and conditional GET handling for items."""
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Request
+from app.timeutil import as_utc
+
+
+def item_etag(item_id: int, updated_at: datetime) -> str:
+    """Weak ETag derived from an item's ID and last update time."""
+    return f'W/"{item_id}-{as_utc(updated_at).strftime("%Y%m%d%H%M%S%f")}"'
+
+
+def cache_headers(item_id: int, updated_at: datetime) -> dict[str, str]:
+    """Validator headers for an item response."""
+    return {
+        "ETag": item_etag(item_id, updated_at),
+        "Last-Modified": format_datetime(as_utc(updated_at), usegmt=True),
+        # Allow caching, but revalidate with the ETag before every reuse
+        "Cache-Control": "no-cache",
+        # Item reads can be negotiated as JSON or MessagePack
+        "Vary": "Accept",
+    }
+
+
+def is_not_modified(request: Request, item_id: int, updated_at: datetime) -> bool:
+    """
+    Check the request's conditional headers against an item.
+    
+    ``If-None-Match`` takes precedence over ``If-Modified-Since``, as in
+    RFC 9110. ETags are compared weakly.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        current = item_etag(item_id, updated_at).removeprefix("W/")
+        return any(tag.strip().removeprefix("W/") == current for tag in if_none_match.split(","))
+    
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have one-second resolution
+        return as_utc(updated_at).replace(microsecond=0) <= as_utc(since)
+    
+    return False
@@ -1,8 +1,88 @@
 """CRUD operations for database models."""
-from typing import Optional
+import io
+import os
+from datetime import datetime
+from decimal import Decimal
+from functools import partial
+from typing import Callable, Collection, Iterator, Optional
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app import models, schemas
+from sqlalchemy import Date, Select, case, cast, column, func, literal_column, select, table, text, insert, update, delete
+from sqlalchemy.dialects.postgresql import REGCONFIG, TSVECTOR
+from sqlalchemy.exc import DBAPIError
+from app import changes, models, schemas
+from app.cache import CacheBackend, NullCache, TTLCache
+
+# Seconds to cache filtered item counts for (0 disables the cache)
+COUNT_CACHE_TTL = float(os.getenv("ITEMS_COUNT_CACHE_TTL", "0"))
+
+# Rows fetched per round trip when streaming exports
+EXPORT_BATCH_SIZE = int(os.getenv("ITEMS_EXPORT_BATCH_SIZE", "1000"))
+
+# Default number of rows per INSERT/COPY batch for bulk ingest
+BULK_BATCH_SIZE = int(os.getenv("ITEMS_BULK_BATCH_SIZE", "1000"))
+
+# Seconds to cache single items for (0 disables the cache) and max cached items
+ITEM_CACHE_TTL = float(os.getenv("ITEM_CACHE_TTL", "60"))
+ITEM_CACHE_SIZE = int(os.getenv("ITEM_CACHE_SIZE", "10000"))
+
+# Item attributes in response order; ``fields`` arguments select a subset of them
+ITEM_FIELDS = ("name", "description", "category", "record_type", "sum", "id", "created_at", "updated_at")
+
+_count_cache = TTLCache(maxsize=256, ttl=COUNT_CACHE_TTL)
+
+item_cache: CacheBackend = (
+    TTLCache(maxsize=ITEM_CACHE_SIZE, ttl=ITEM_CACHE_TTL) if ITEM_CACHE_TTL > 0 else NullCache()
+)
+
+RollupKey = tuple[Optional[models.CategoryEnum], models.RecordTypeEnum]
+
+
+def set_item_cache(backend: CacheBackend) -> None:
+    """Replace the item cache, e.g. with a backend shared between workers."""
+    global item_cache
+    item_cache = backend
+
+
+def invalidate_counts() -> None:
+    """Drop cached list totals, after writes that add or remove items."""
+    _count_cache.clear()
+
+
+def count_cache_key(
+    category: Optional[models.CategoryEnum] = None,
+    record_type: Optional[models.RecordTypeEnum] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
+) -> tuple:
+    """Key of the cached list total for a filter combination."""
+    return (category, record_type, created_from, created_to)
+
+
+def cached_count(key: tuple) -> Optional[int]:
+    """Cached list total for ``key``, or ``None`` when missing or the count cache is disabled."""
+    if COUNT_CACHE_TTL > 0:
+        return _count_cache.get(key)
+    return None
+
+
+def store_count(key: tuple, total: int) -> None:
+    """Cache the list total for ``key`` when the count cache is enabled."""
+    if COUNT_CACHE_TTL > 0:
+        _count_cache.set(key, total)
+
+
+def page_total(rows: list[Row], skip: int) -> Optional[int]:
+    """
+    Total count carried by a page selected with a ``total`` window column.
+    
+    Returns ``None`` for an empty page past the first one: it may lie past
+    the end of a non-empty result set, where the window count has no row to
+    ride on, so the caller needs a separate count query.
+    """
+    if rows:
+        return rows[0].total
+    return None if skip else 0
 
 
 def get_item(db: Session, item_id: int) -> Optional[models.Item]:
@@ -10,79 +90,855 @@ def get_item(db: Session, item_id: int) -> Optional[models.Item]:
     return db.query(models.Item).filter(models.Item.id == item_id).first()
 
 
+def get_item_cached(db: Session, item_id: int) -> Optional[schemas.ItemResponse]:
+    """
+    Get a single item by ID through the read-through item cache.
+    
+    Entries are invalidated by :func:`update_item` and :func:`delete_item`.
+    Items read from a replica session are not cached: they may predate a
+    write whose invalidation already happened.
+    """
+    cached = item_cache.get(item_id)
+    if cached is not None:
+        return cached
+    
+    db_item = get_item(db, item_id)
+    if db_item is None:
+        return None
+    
+    item = schemas.ItemResponse.model_validate(db_item)
+    if not db.info.get("replica"):
+        item_cache.set(item_id, item)
+    return item
+
+
+def item_columns(fields: Optional[Collection[str]] = None) -> list:
+    """Item table columns for ``fields`` (all of them when ``None``); ``id`` is always selected."""
+    columns = models.Item.__table__.columns
+    if fields is None:
+        return list(columns)
+    return [column for column in columns if column.name == "id" or column.name in fields]
+
+
+def get_item_fields(db: Session, item_id: int, fields: Collection[str]) -> Optional[object]:
+    """
+    Get ``fields`` (plus ``id`` and ``updated_at``) of a single item.
+    
+    A full item already in the item cache is returned as is. Otherwise only
+    the requested columns are selected, and the partial row is not cached.
+    """
+    cached = item_cache.get(item_id)
+    if cached is not None:
+        return cached
+    
+    return db.execute(item_fields_statement(item_id, fields)).first()
+
+
+def apply_filters(
+    query,
+    category: Optional[models.CategoryEnum] = None,
+    record_type: Optional[models.RecordTypeEnum] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
+):
+    """
+    Apply the optional list filters to a query or select statement.
+    
+    The creation time range is half-open: ``created_from <= created_at < created_to``.
+    """
+    if category is not None:
+        query = query.where(models.Item.category == category)
+    if record_type is not None:
+        query = query.where(models.Item.record_type == record_type)
+    if created_from is not None:
+        query = query.where(models.Item.created_at >= created_from)
+    if created_to is not None:
+        query = query.where(models.Item.created_at < created_to)
+    return query
+
+
+def item_fields_statement(item_id: int, fields: Collection[str]) -> Select:
+    """Select ``fields`` plus ``id`` and ``updated_at`` of a single item."""
+    return select(*item_columns({*fields, "updated_at"})).where(models.Item.id == item_id)
+
+
+def items_statement(
+    skip: int = 0,
+    limit: int = 100,
+    category: Optional[models.CategoryEnum] = None,
+    record_type: Optional[models.RecordTypeEnum] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    after_id: Optional[int] = None,
+    fields: Optional[Collection[str]] = None
+) -> Select:
+    """Select a page of item rows ordered by ID, see :func:`get_items`."""
+    stmt = apply_filters(
+        select(*item_columns(fields)),
+        category,
+        record_type,
+        created_from,
+        created_to
+    ).order_by(models.Item.id)
+    if after_id is not None:
+        stmt = stmt.where(models.Item.id > after_id)
+    else:
+        stmt = stmt.offset(skip)
+    return stmt.limit(limit)
+
+
+def items_with_total_statement(
+    skip: int = 0,
+    limit: int = 100,
+    category: Optional[models.CategoryEnum] = None,
+    record_type: Optional[models.RecordTypeEnum] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    fields: Optional[Collection[str]] = None
+) -> Select:
+    """Select a page of item rows with a ``total`` window count, see :func:`get_items_with_total`."""
+    return apply_filters(
+        select(*item_columns(fields), func.count().over().label("total")),
+        category,
+        record_type,
+        created_from,
+        created_to
+    ).order_by(models.Item.id).offset(skip).limit(limit)
+
+
+def count_statement(
+    category: Optional[models.CategoryEnum] = None,
+    record_type: Optional[models.RecordTypeEnum] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
+) -> Select:
+    """Select the number of items matching the filters."""
+    return apply_filters(select(func.count(models.Item.id)), category, record_type, created_from, created_to)
+
+
 def get_items(
     db: Session,
     skip: int = 0,
     limit: int = 100,
     category: Optional[models.CategoryEnum] = None,
-    record_type: Optional[models.RecordTypeEnum] = None
-) -> list[models.Item]:
-    """Get a list of items with pagination and optional filtering."""
-    query = db.query(models.Item)
+    record_type: Optional[models.RecordTypeEnum] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    after_id: Optional[int] = None,
+    fields: Optional[Collection[str]] = None
+) -> list[Row]:
+    """
+    Get a list of items ordered by ID with pagination and optional filtering.
     
-    # Apply filters if provided
-    if category is not None:
-        query = query.filter(models.Item.category == category)
-    if record_type is not None:
-        query = query.filter(models.Item.record_type == record_type)
+    Items are returned as column rows rather than ORM objects, which are
+    expensive to build for large pages and not needed by read-only callers.
+    ``fields`` limits the selected columns to those item attributes.
     
-    return query.offset(skip).limit(limit).all()
+    When ``after_id`` is given, keyset pagination is used: only items with a
+    greater ID are returned and ``skip`` is ignored, so deep pages cost the
+    same as the first one.
+    """
+    stmt = items_statement(
+        skip=skip,
+        limit=limit,
+        category=category,
+        record_type=record_type,
+        created_from=created_from,
+        created_to=created_to,
+        after_id=after_id,
+        fields=fields
+    )
+    return db.execute(stmt).all()
+
+
+def get_items_with_total(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    category: Optional[models.CategoryEnum] = None,
+    record_type: Optional[models.RecordTypeEnum] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    fields: Optional[Collection[str]] = None
+) -> tuple[list[Row], int]:
+    """
+    Get a page of item rows and the total filtered count in a single statement.
+    
+    The total is computed with a ``COUNT(*) OVER ()`` window, which is
+    evaluated before ``LIMIT``/``OFFSET``. Only a page past the end of the
+    result set needs a separate count query. A cached count, when available,
+    lets the page be fetched without the window.
+    """
+    key = count_cache_key(category, record_type, created_from, created_to)
+    cached = cached_count(key)
+    if cached is not None:
+        items = get_items(
+            db,
+            skip=skip,
+            limit=limit,
+            category=category,
+            record_type=record_type,
+            created_from=created_from,
+            created_to=created_to,
+            fields=fields
+        )
+        return items, cached
+    
+    stmt = items_with_total_statement(
+        skip=skip,
+        limit=limit,
+        category=category,
+        record_type=record_type,
+        created_from=created_from,
+        created_to=created_to,
+        fields=fields
+    )
+    rows = db.execute(stmt).all()
+    
+    total = page_total(rows, skip)
+    if total is None:
+        return [], get_items_count(
+            db,
+            category=category,
+            record_type=record_type,
+            created_from=created_from,
+            created_to=created_to
+        )
+    
+    store_count(key, total)
+    # The rows keep their extra "total" column; callers read items by column name
+    return rows, total
+
+
+def _fts5_query(q: str) -> str:
+    """Turn free text into an FTS5 query matching all of its words, without FTS5 operators."""
+    words = q.split()
+    if not words:
+        # An empty phrase is valid FTS5 and matches nothing
+        return '""'
+    return " ".join('"' + word.replace('"', '""') + '"' for word in words)
+
+
+def search_items(
+    db: Session,
+    q: str,
+    skip: int = 0,
+    limit: int = 100,
+    category: Optional[models.CategoryEnum] = None,
+    record_type: Optional[models.RecordTypeEnum] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    fields: Optional[Collection[str]] = None
+) -> tuple[list[Row], int]:
+    """
+    Full-text search over item names and descriptions, best matches first.
+    
+    On PostgreSQL ``q`` is parsed with ``websearch_to_tsquery`` (quoted
+    phrases, ``or`` and ``-word`` are supported) and matched against the
+    GIN-indexed ``search_vector`` column, ranked with ``ts_rank_cd``; names
+    weigh more than descriptions. Elsewhere the FTS5 ``items_fts`` table is
+    used, matching all words of ``q``, ranked with ``bm25``. Ties are broken
+    by ID so pages are stable. Returns the page and the total match count.
+    """
+    columns = item_columns(fields)
+    if db.get_bind().dialect.name == "postgresql":
+        vector = literal_column("items.search_vector", TSVECTOR)
+        tsquery = func.websearch_to_tsquery(cast(models.SEARCH_CONFIG, REGCONFIG), q)
+        rank = func.ts_rank_cd(vector, tsquery)
+        stmt = select(*columns).where(vector.bool_op("@@")(tsquery)).order_by(rank.desc(), models.Item.id)
+    else:
+        # bm25() cannot share a statement with the count window, so rank in a subquery.
+        # Lower scores are better; the weights mirror the PostgreSQL name/description weights.
+        fts = table("items_fts", column("rowid"))
+        matches = (
+            select(fts.c.rowid, literal_column("bm25(items_fts, 2.5, 1.0)").label("rank"))
+            .where(literal_column("items_fts").op("MATCH")(_fts5_query(q)))
+            .subquery()
+        )
+        stmt = (
+            select(*columns)
+            .join_from(models.Item, matches, matches.c.rowid == models.Item.id)
+            .order_by(matches.c.rank, models.Item.id)
+        )
+    stmt = apply_filters(stmt, category, record_type, created_from, created_to)
+    
+    rows = db.execute(
+        stmt.add_columns(func.count().over().label("total")).offset(skip).limit(limit)
+    ).all()
+    total = page_total(rows, skip)
+    if total is not None:
+        return rows, total
+    # Past the last page: the window count has no row to ride on
+    total = db.execute(select(func.count()).select_from(stmt.order_by(None).subquery())).scalar_one()
+    return [], total
+
+
+def stream_items(
+    db: Session,
+    category: Optional[models.CategoryEnum] = None,
+    record_type: Optional[models.RecordTypeEnum] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    batch_size: int = EXPORT_BATCH_SIZE
+) -> Iterator[list[Row]]:
+    """
+    Stream all matching items as batches of column rows ordered by ID.
+    
+    Rows are read through a server-side cursor ``batch_size`` at a time and
+    no ORM objects are built, so memory stays flat regardless of table size.
+    """
+    stmt = apply_filters(
+        select(*models.Item.__table__.columns).order_by(models.Item.id),
+        category,
+        record_type,
+        created_from,
+        created_to
+    ).execution_options(yield_per=batch_size)
+    
+    yield from db.execute(stmt).partitions()
 
 
 def get_items_count(
     db: Session,
     category: Optional[models.CategoryEnum] = None,
-    record_type: Optional[models.RecordTypeEnum] = None
+    record_type: Optional[models.RecordTypeEnum] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
+) -> int:
+    """
+    Get total count of items with optional filtering.
+    
+    Counts are cached per filter combination for ``ITEMS_COUNT_CACHE_TTL``
+    seconds when that setting is positive.
+    """
+    key = count_cache_key(category, record_type, created_from, created_to)
+    cached = cached_count(key)
+    if cached is not None:
+        return cached
+    
+    total = db.scalar(count_statement(category, record_type, created_from, created_to))
+    
+    store_count(key, total)
+    return total
+
+
+def get_items_count_estimate(
+    db: Session,
+    category: Optional[models.CategoryEnum] = None,
+    record_type: Optional[models.RecordTypeEnum] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
 ) -> int:
-    """Get total count of items with optional filtering."""
-    query = db.query(func.count(models.Item.id))
+    """
+    Get an approximate count of items from planner statistics.
+    
+    On PostgreSQL the row estimate of the filtered scan is read from
+    ``EXPLAIN``, which costs no table access. Other databases fall back to
+    an exact count.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return get_items_count(
+            db,
+            category=category,
+            record_type=record_type,
+            created_from=created_from,
+            created_to=created_to
+        )
     
-    # Apply filters if provided
+    stmt = apply_filters(select(models.Item.id), category, record_type, created_from, created_to)
+    compiled = stmt.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True})
+    plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _add_rollup_delta(
+    deltas: dict[RollupKey, tuple[int, Decimal]],
+    category: Optional[models.CategoryEnum],
+    record_type: models.RecordTypeEnum,
+    count: int,
+    amount: Decimal
+) -> None:
+    """Accumulate a count/total change for one rollup key."""
+    key = (category, record_type)
+    current_count, current_amount = deltas.get(key, (0, Decimal(0)))
+    deltas[key] = (current_count + count, current_amount + amount)
+
+
+def _rollup_key_filter(category: Optional[models.CategoryEnum], record_type: models.RecordTypeEnum):
+    """SQL condition matching the rollup rows of one key."""
+    rollup = models.ItemRollup
+    if category is None:
+        return (rollup.category.is_(None)) & (rollup.record_type == record_type)
+    return (rollup.category == category) & (rollup.record_type == record_type)
+
+
+def _apply_rollup_deltas(db: Session, deltas: dict[RollupKey, tuple[int, Decimal]]) -> None:
+    """
+    Apply accumulated rollup changes within the caller's transaction.
+    
+    Keys are updated in a fixed order so that writers touching two keys
+    (e.g. an update that changes category) cannot deadlock each other.
+    """
+    rollup = models.ItemRollup
+    ordered = sorted(
+        deltas.items(),
+        key=lambda entry: (entry[0][0].value if entry[0][0] is not None else "", entry[0][1].value)
+    )
+    for (category, record_type), (count, amount) in ordered:
+        if count == 0 and amount == 0:
+            continue
+        key_filter = _rollup_key_filter(category, record_type)
+        result = db.execute(
+            update(rollup)
+            .where(rollup.id == select(func.min(rollup.id)).where(key_filter).scalar_subquery())
+            .values(count=rollup.count + count, total=rollup.total + amount)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            db.execute(insert(rollup).values(
+                category=category,
+                record_type=record_type,
+                count=count,
+                total=amount
+            ))
+
+
+def _lock_rollups(db: Session) -> None:
+    """Serialize rollup rebuilds with concurrent writers on PostgreSQL."""
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE item_rollups IN EXCLUSIVE MODE"))
+
+
+def _rebuild_rollups(db: Session) -> None:
+    """Recompute all rollup rows from ``items``."""
+    rollup = models.ItemRollup
+    totals: dict[RollupKey, tuple[int, Decimal]] = {
+        (category, record_type): (0, Decimal(0))
+        for category in [None, *models.CategoryEnum]
+        for record_type in models.RecordTypeEnum
+    }
+    grouped = db.query(
+        models.Item.category,
+        models.Item.record_type,
+        func.count(models.Item.id),
+        func.coalesce(func.sum(models.Item.sum), 0)
+    ).group_by(models.Item.category, models.Item.record_type)
+    for category, record_type, count, amount in grouped:
+        totals[(category, record_type)] = (count, Decimal(amount))
+    
+    db.execute(delete(rollup))
+    db.execute(insert(rollup), [
+        {"category": category, "record_type": record_type, "count": count, "total": amount}
+        for (category, record_type), (count, amount) in totals.items()
+    ])
+
+
+def rebuild_rollups(db: Session) -> None:
+    """Recompute the summary rollups from scratch."""
+    _lock_rollups(db)
+    _rebuild_rollups(db)
+    db.commit()
+
+
+def ensure_rollups(db: Session) -> None:
+    """Build the summary rollups if they have never been populated."""
+    _lock_rollups(db)
+    if db.query(models.ItemRollup.id).first() is None:
+        _rebuild_rollups(db)
+    db.commit()
+
+
+def get_summary(
+    db: Session,
+    category: Optional[models.CategoryEnum] = None,
+    record_type: Optional[models.RecordTypeEnum] = None
+) -> list[Row]:
+    """
+    Get item counts and totals grouped by category and record type.
+    
+    Reads the incrementally maintained rollups, so the cost depends on the
+    number of categories rather than the number of items.
+    """
+    rollup = models.ItemRollup
+    query = db.query(
+        rollup.category,
+        rollup.record_type,
+        func.sum(rollup.count).label("count"),
+        func.sum(rollup.total).label("total")
+    )
     if category is not None:
-        query = query.filter(models.Item.category == category)
+        query = query.filter(rollup.category == category)
     if record_type is not None:
-        query = query.filter(models.Item.record_type == record_type)
+        query = query.filter(rollup.record_type == record_type)
     
-    return query.scalar()
+    return (
+        query.group_by(rollup.category, rollup.record_type)
+        .having(func.sum(rollup.count) > 0)
+        .order_by(rollup.record_type, rollup.category)
+        .all()
+    )
+
+
+TIMESERIES_BUCKETS = ("day", "week", "month")
+
+
+def _bucket_expression(db: Session, bucket: str):
+    """
+    SQL expression truncating ``created_at`` to the start of a bucket.
+    
+    Buckets are in UTC and weeks start on Monday. PostgreSQL uses
+    ``date_trunc``; SQLite, which has no equivalent, uses date modifiers.
+    """
+    if bucket not in TIMESERIES_BUCKETS:
+        raise ValueError(f"Unsupported bucket: {bucket}")
+    
+    created_at = models.Item.created_at
+    if db.get_bind().dialect.name == "postgresql":
+        return cast(func.date_trunc(bucket, func.timezone("UTC", created_at)), Date)
+    if bucket == "day":
+        return func.date(created_at)
+    if bucket == "week":
+        return func.date(created_at, "-6 days", "weekday 1")
+    return func.strftime("%Y-%m-01", created_at)
+
+
+def _record_type_total(record_type: models.RecordTypeEnum):
+    """Aggregate summing ``sum`` over the items of one record type."""
+    return func.coalesce(
+        func.sum(case((models.Item.record_type == record_type, models.Item.sum), else_=0)),
+        0
+    )
 
 
-def create_item(db: Session, item: schemas.ItemCreate) -> models.Item:
-    """Create a new item."""
-    db_item = models.Item(
-        name=item.name,
-        description=item.description,
-        category=item.category,
-        record_type=item.record_type,
-        sum=item.sum
+def get_timeseries(
+    db: Session,
+    bucket: str = "day",
+    category: Optional[models.CategoryEnum] = None,
+    record_type: Optional[models.RecordTypeEnum] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
+) -> list[Row]:
+    """
+    Get income and expense totals per time bucket.
+    
+    Aggregation is done by the database in a single grouped query, which
+    can use the ``created_at`` indexes for the time range. Buckets without
+    items are omitted.
+    """
+    bucket_start = _bucket_expression(db, bucket).label("bucket")
+    query = db.query(
+        bucket_start,
+        _record_type_total(models.RecordTypeEnum.INCOME).label("income"),
+        _record_type_total(models.RecordTypeEnum.EXPENSE).label("expense"),
+        func.count(models.Item.id).label("count")
     )
-    db.add(db_item)
+    query = apply_filters(query, category, record_type, created_from, created_to)
+    
+    return query.group_by(bucket_start).order_by(bucket_start).all()
+
+
+def create_item(db: Session, item: schemas.ItemCreate) -> Row:
+    """
+    Create a new item.
+    
+    The row is read back by ``INSERT ... RETURNING`` instead of refreshing an
+    ORM object after the commit.
+    """
+    row = insert_items(db, [item])[0]
     db.commit()
-    db.refresh(db_item)
-    return db_item
+    invalidate_counts()
+    return row
 
 
-def update_item(db: Session, item_id: int, item: schemas.ItemUpdate) -> Optional[models.Item]:
-    """Update an existing item."""
-    db_item = get_item(db, item_id)
-    if db_item is None:
+def _item_values(item: schemas.ItemCreate) -> dict:
+    """Column values for inserting an item."""
+    return {
+        "name": item.name,
+        "description": item.description,
+        "category": item.category,
+        "record_type": item.record_type,
+        "sum": item.sum,
+    }
+
+
+def _creation_deltas(items) -> dict[RollupKey, tuple[int, Decimal]]:
+    """Rollup changes caused by inserting ``items``."""
+    deltas: dict[RollupKey, tuple[int, Decimal]] = {}
+    for item in items:
+        _add_rollup_delta(deltas, item.category, item.record_type, 1, item.sum)
+    return deltas
+
+
+def insert_items(db: Session, items: list[schemas.ItemCreate]) -> list[Row]:
+    """
+    Insert items with a multi-row ``INSERT ... RETURNING`` in the caller's transaction.
+    
+    Returns the complete new rows in input order and adjusts the rollups
+    and the change feed, but does not commit.
+    """
+    table = models.Item.__table__
+    stmt = insert(table).returning(*table.columns, sort_by_parameter_order=True)
+    rows = db.execute(stmt, [_item_values(item) for item in items]).all()
+    _apply_rollup_deltas(db, _creation_deltas(items))
+    changes.notify(db, "created", rows)
+    return rows
+
+
+def bulk_create_items(
+    db: Session,
+    items: list[tuple[int, schemas.ItemCreate]]
+) -> tuple[list[int], list[tuple[int, str]]]:
+    """
+    Insert a batch of items with a multi-row INSERT ... RETURNING.
+    
+    ``items`` pairs each item with its position in the caller's input. If the
+    batch is rejected by the database, it is retried row by row so that only
+    the offending rows fail. Returns the new IDs and ``(position, error)``
+    pairs for rejected rows.
+    """
+    if not items:
+        return [], []
+    
+    table = models.Item.__table__
+    stmt = insert(table).returning(*table.columns, sort_by_parameter_order=True)
+    try:
+        with db.begin_nested():
+            rows = db.execute(stmt, [_item_values(item) for _, item in items]).all()
+            _apply_rollup_deltas(db, _creation_deltas(item for _, item in items))
+            changes.notify(db, "created", rows)
+        db.commit()
+        invalidate_counts()
+        return [row.id for row in rows], []
+    except DBAPIError as e:
+        if len(items) == 1:
+            db.commit()
+            return [], [(items[0][0], str(e.orig))]
+    
+    rows: list[Row] = []
+    errors: list[tuple[int, str]] = []
+    for index, item in items:
+        try:
+            with db.begin_nested():
+                row = db.execute(stmt, _item_values(item)).one()
+                _apply_rollup_deltas(db, _creation_deltas([item]))
+            rows.append(row)
+        except DBAPIError as e:
+            errors.append((index, str(e.orig)))
+    # One notification for the accepted rows, as if they had been inserted together
+    changes.notify(db, "created", rows)
+    db.commit()
+    invalidate_counts()
+    return [row.id for row in rows], errors
+
+
+def copy_items(db: Session, items: list[schemas.ItemCreate]) -> int:
+    """
+    Insert a batch of items with PostgreSQL ``COPY FROM STDIN``.
+    
+    COPY is all-or-nothing and returns no IDs; callers should fall back to
+    :func:`bulk_create_items` when it raises :class:`~sqlalchemy.exc.DBAPIError`.
+    Returns the number of rows copied.
+    """
+    def field(value) -> str:
+        if value is None:
+            return "\\N"
+        return '"' + str(value).replace('"', '""') + '"'
+    
+    buffer = io.StringIO()
+    for item in items:
+        buffer.write(",".join((
+            field(item.name),
+            field(item.description),
+            # Enum columns store member names
+            field(item.category.name if item.category is not None else None),
+            field(item.record_type.name),
+            field(item.sum),
+        )))
+        buffer.write("\n")
+    buffer.seek(0)
+    
+    statement = (
+        "COPY items (name, description, category, record_type, sum) "
+        "FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+    )
+    dbapi_error = db.get_bind().dialect.dbapi.Error
+    with db.begin_nested():
+        cursor = db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(statement, buffer)
+        except dbapi_error as e:
+            # The raw driver cursor bypasses SQLAlchemy's exception wrapping
+            raise DBAPIError.instance(statement, None, e, dbapi_error) from e
+        finally:
+            cursor.close()
+        _apply_rollup_deltas(db, _creation_deltas(items))
+        # COPY returns no rows to describe
+        changes.notify(db, "reset")
+    db.commit()
+    invalidate_counts()
+    return len(items)
+
+
+ROLLUP_FIELDS = frozenset({"category", "record_type", "sum"})
+
+
+def _rollup_targets():
+    """Select the ID and rollup columns of items."""
+    return select(models.Item.id, models.Item.category, models.Item.record_type, models.Item.sum)
+
+
+def _update_returning(db: Session, apply_where: Callable, values: dict) -> list[Row]:
+    """
+    Update the items selected by ``apply_where`` with ``UPDATE ... RETURNING``.
+    
+    ``apply_where`` adds the row selection to a statement. When the change
+    touches rollup columns, the pre-update values are needed as well: on
+    PostgreSQL the rows are locked in ID order by a ``FROM`` subquery that
+    also returns them, so concurrent bulk writers cannot deadlock; SQLite
+    cannot return ``FROM`` columns, so they are read first. Rollups are
+    adjusted in the same transaction.
+    """
+    table = models.Item.__table__
+    stmt = update(table).values(**values)
+    if ROLLUP_FIELDS.isdisjoint(values):
+        return db.execute(apply_where(stmt).returning(*table.columns)).all()
+    
+    targets = apply_where(_rollup_targets()).order_by(models.Item.id).with_for_update()
+    if db.get_bind().dialect.name == "postgresql":
+        old = targets.subquery("old")
+        rows = db.execute(
+            stmt.where(table.c.id == old.c.id).returning(
+                *table.columns,
+                old.c.category.label("old_category"),
+                old.c.record_type.label("old_record_type"),
+                old.c.sum.label("old_sum")
+            )
+        ).all()
+        old_values = {row.id: (row.old_category, row.old_record_type, row.old_sum) for row in rows}
+    else:
+        old_values = {row.id: (row.category, row.record_type, row.sum) for row in db.execute(targets)}
+        rows = db.execute(
+            stmt.where(table.c.id.in_(targets.with_only_columns(models.Item.id))).returning(*table.columns)
+        ).all()
+    
+    deltas: dict[RollupKey, tuple[int, Decimal]] = {}
+    for row in rows:
+        old_category, old_record_type, old_sum = old_values[row.id]
+        _add_rollup_delta(deltas, old_category, old_record_type, -1, -old_sum)
+        _add_rollup_delta(deltas, row.category, row.record_type, 1, row.sum)
+    _apply_rollup_deltas(db, deltas)
+    return rows
+
+
+def update_item(db: Session, item_id: int, item: schemas.ItemUpdate) -> Optional[schemas.ItemResponse]:
+    """
+    Update an existing item.
+    
+    Changes the row and reads it back in a single ``UPDATE ... RETURNING``
+    statement instead of loading, flushing and refreshing an ORM object.
+    """
+    update_data = item.model_dump(exclude_unset=True)
+    if not update_data:
+        db_item = get_item(db, item_id)
+        return schemas.ItemResponse.model_validate(db_item) if db_item is not None else None
+    
+    rows = _update_returning(db, lambda stmt: stmt.where(models.Item.id == item_id), update_data)
+    changes.notify(db, "updated", rows)
+    db.commit()
+    if not rows:
         return None
     
-    # Update only provided fields
+    invalidate_counts()
+    item_cache.delete(item_id)
+    return schemas.ItemResponse.model_validate(rows[0])
+
+
+def update_items(
+    db: Session,
+    item: schemas.ItemUpdate,
+    category: Optional[models.CategoryEnum] = None,
+    record_type: Optional[models.RecordTypeEnum] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
+) -> int:
+    """
+    Apply the same change to every item matching the filters in one statement.
+    
+    Returns the number of updated items.
+    """
     update_data = item.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_item, field, value)
+    if not update_data:
+        return 0
     
+    apply_where = partial(
+        apply_filters,
+        category=category,
+        record_type=record_type,
+        created_from=created_from,
+        created_to=created_to
+    )
+    rows = _update_returning(db, apply_where, update_data)
+    changes.notify(db, "updated", rows)
     db.commit()
-    db.refresh(db_item)
-    return db_item
+    
+    invalidate_counts()
+    for row in rows:
+        item_cache.delete(row.id)
+    return len(rows)
 
 
 def delete_item(db: Session, item_id: int) -> bool:
-    """Delete an item."""
-    db_item = get_item(db, item_id)
-    if db_item is None:
+    """Delete an item with a single ``DELETE ... RETURNING`` statement."""
+    table = models.Item.__table__
+    row = db.execute(
+        delete(table)
+        .where(table.c.id == item_id)
+        .returning(table.c.id, table.c.category, table.c.record_type, table.c.sum)
+    ).first()
+    if row is None:
         return False
     
-    db.delete(db_item)
+    _apply_rollup_deltas(db, {(row.category, row.record_type): (-1, -row.sum)})
+    changes.notify(db, "deleted", [row])
     db.commit()
+    invalidate_counts()
+    item_cache.delete(item_id)
     return True
+
+
+def delete_items(
+    db: Session,
+    category: Optional[models.CategoryEnum] = None,
+    record_type: Optional[models.RecordTypeEnum] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
+) -> int:
+    """
+    Delete every item matching the filters in one statement.
+    
+    Rows are locked in ID order before deletion so that concurrent bulk
+    writers cannot deadlock. Returns the number of deleted items.
+    """
+    table = models.Item.__table__
+    targets = (
+        apply_filters(select(models.Item.id), category, record_type, created_from, created_to)
+        .order_by(models.Item.id)
+        .with_for_update()
+    )
+    rows = db.execute(
+        delete(table)
+        .where(table.c.id.in_(targets))
+        .returning(table.c.id, table.c.category, table.c.record_type, table.c.sum)
+    ).all()
+    
+    deltas: dict[RollupKey, tuple[int, Decimal]] = {}
+    for row in rows:
+        _add_rollup_delta(deltas, row.category, row.record_type, -1, -row.sum)
+    _apply_rollup_deltas(db, deltas)
+    changes.notify(db, "deleted", rows)
+    db.commit()
+    
+    invalidate_counts()
+    for row in rows:
+        item_cache.delete(row.id)
+    return len(rows)
@@ -0,0 +1,259 @@
+"""Async CRUD operations for database models.
+
+Reads are issued directly on the ``AsyncSession``, using the statement
+builders and count cache of :mod:`app.crud`. Writes run the sync
+implementations from :mod:`app.crud` through ``AsyncSession.run_sync``, which
+keeps a single copy of the rollup maintenance while still awaiting the
+database instead of blocking a thread.
+"""
+from datetime import datetime
+from typing import Collection, Optional
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import crud, models, schemas
+
+
+async def get_item(db: AsyncSession, item_id: int) -> Optional[models.Item]:
+    """Get a single item by ID."""
+    return await db.get(models.Item, item_id)
+
+
+async def get_item_cached(db: AsyncSession, item_id: int) -> Optional[schemas.ItemResponse]:
+    """Get a single item by ID through the item cache, see :func:`app.crud.get_item_cached`."""
+    cached = crud.item_cache.get(item_id)
+    if cached is not None:
+        return cached
+    
+    db_item = await get_item(db, item_id)
+    if db_item is None:
+        return None
+    
+    item = schemas.ItemResponse.model_validate(db_item)
+    if not db.info.get("replica"):
+        crud.item_cache.set(item_id, item)
+    return item
+
+
+async def get_item_fields(db: AsyncSession, item_id: int, fields: Collection[str]) -> Optional[object]:
+    """Get some fields of a single item, see :func:`app.crud.get_item_fields`."""
+    cached = crud.item_cache.get(item_id)
+    if cached is not None:
+        return cached
+    
+    return (await db.execute(crud.item_fields_statement(item_id, fields))).first()
+
+
+async def get_items(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    category: Optional[models.CategoryEnum] = None,
+    record_type: Optional[models.RecordTypeEnum] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    after_id: Optional[int] = None,
+    fields: Optional[Collection[str]] = None
+) -> list[Row]:
+    """Get a list of item rows ordered by ID, see :func:`app.crud.get_items`."""
+    stmt = crud.items_statement(
+        skip=skip,
+        limit=limit,
+        category=category,
+        record_type=record_type,
+        created_from=created_from,
+        created_to=created_to,
+        after_id=after_id,
+        fields=fields
+    )
+    return (await db.execute(stmt)).all()
+
+
+async def get_items_with_total(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    category: Optional[models.CategoryEnum] = None,
+    record_type: Optional[models.RecordTypeEnum] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    fields: Optional[Collection[str]] = None
+) -> tuple[list[Row], int]:
+    """Get a page of item rows and the total count, see :func:`app.crud.get_items_with_total`."""
+    key = crud.count_cache_key(category, record_type, created_from, created_to)
+    cached = crud.cached_count(key)
+    if cached is not None:
+        items = await get_items(
+            db,
+            skip=skip,
+            limit=limit,
+            category=category,
+            record_type=record_type,
+            created_from=created_from,
+            created_to=created_to,
+            fields=fields
+        )
+        return items, cached
+    
+    stmt = crud.items_with_total_statement(
+        skip=skip,
+        limit=limit,
+        category=category,
+        record_type=record_type,
+        created_from=created_from,
+        created_to=created_to,
+        fields=fields
+    )
+    rows = (await db.execute(stmt)).all()
+    
+    total = crud.page_total(rows, skip)
+    if total is None:
+        return [], await get_items_count(
+            db,
+            category=category,
+            record_type=record_type,
+            created_from=created_from,
+            created_to=created_to
+        )
+    
+    crud.store_count(key, total)
+    return rows, total
+
+
+async def get_items_count(
+    db: AsyncSession,
+    category: Optional[models.CategoryEnum] = None,
+    record_type: Optional[models.RecordTypeEnum] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
+) -> int:
+    """Get total count of items, see :func:`app.crud.get_items_count`."""
+    key = crud.count_cache_key(category, record_type, created_from, created_to)
+    cached = crud.cached_count(key)
+    if cached is not None:
+        return cached
+    
+    total = await db.scalar(crud.count_statement(category, record_type, created_from, created_to))
+    
+    crud.store_count(key, total)
+    return total
+
+
+async def get_items_count_estimate(
+    db: AsyncSession,
+    category: Optional[models.CategoryEnum] = None,
+    record_type: Optional[models.RecordTypeEnum] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
+) -> int:
+    """Get an approximate count of items, see :func:`app.crud.get_items_count_estimate`."""
+    return await db.run_sync(
+        crud.get_items_count_estimate,
+        category=category,
+        record_type=record_type,
+        created_from=created_from,
+        created_to=created_to
+    )
+
+
+async def get_summary(
+    db: AsyncSession,
+    category: Optional[models.CategoryEnum] = None,
+    record_type: Optional[models.RecordTypeEnum] = None
+) -> list[Row]:
+    """Get item counts and totals from the rollups, see :func:`app.crud.get_summary`."""
+    return await db.run_sync(crud.get_summary, category=category, record_type=record_type)
+
+
+async def search_items(
+    db: AsyncSession,
+    q: str,
+    skip: int = 0,
+    limit: int = 100,
+    category: Optional[models.CategoryEnum] = None,
+    record_type: Optional[models.RecordTypeEnum] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    fields: Optional[Collection[str]] = None
+) -> tuple[list[Row], int]:
+    """Full-text search over item names and descriptions, see :func:`app.crud.search_items`."""
+    return await db.run_sync(
+        crud.search_items,
+        q,
+        skip=skip,
+        limit=limit,
+        category=category,
+        record_type=record_type,
+        created_from=created_from,
+        created_to=created_to,
+        fields=fields
+    )
+
+
+async def get_timeseries(
+    db: AsyncSession,
+    bucket: str = "day",
+    category: Optional[models.CategoryEnum] = None,
+    record_type: Optional[models.RecordTypeEnum] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
+) -> list[Row]:
+    """Get income and expense totals per time bucket, see :func:`app.crud.get_timeseries`."""
+    return await db.run_sync(
+        crud.get_timeseries,
+        bucket=bucket,
+        category=category,
+        record_type=record_type,
+        created_from=created_from,
+        created_to=created_to
+    )
+
+
+async def create_item(db: AsyncSession, item: schemas.ItemCreate) -> Row:
+    """Create a new item."""
+    return await db.run_sync(crud.create_item, item)
+
+
+async def update_item(db: AsyncSession, item_id: int, item: schemas.ItemUpdate) -> Optional[schemas.ItemResponse]:
+    """Update an existing item."""
+    return await db.run_sync(crud.update_item, item_id, item)
+
+
+async def update_items(
+    db: AsyncSession,
+    item: schemas.ItemUpdate,
+    category: Optional[models.CategoryEnum] = None,
+    record_type: Optional[models.RecordTypeEnum] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
+) -> int:
+    """Update every item matching the filters, see :func:`app.crud.update_items`."""
+    return await db.run_sync(
+        crud.update_items,
+        item,
+        category=category,
+        record_type=record_type,
+        created_from=created_from,
+        created_to=created_to
+    )
+
+
+async def delete_item(db: AsyncSession, item_id: int) -> bool:
+    """Delete an item."""
+    return await db.run_sync(crud.delete_item, item_id)
+
+
+async def delete_items(
+    db: AsyncSession,
+    category: Optional[models.CategoryEnum] = None,
+    record_type: Optional[models.RecordTypeEnum] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
+) -> int:
+    """Delete every item matching the filters, see :func:`app.crud.delete_items`."""
+    return await db.run_sync(
+        crud.delete_items,
+        category=category,
+        record_type=record_type,
+        created_from=created_from,
+        created_to=created_to
+    )
@@ -0,0 +1,213 @@
+"""Idempotency keys for item writes.
+
+A writing item request (POST, PUT, PATCH, DELETE) sent with an
+``Idempotency-Key`` header is executed once. Its response is stored under
+the key for ``IDEMPOTENCY_TTL_SECONDS``, and repeats of the request are
+answered from the store, marked with ``Idempotent-Replayed: true``, without
+touching the database. A repeat that arrives while the original is still
+running waits for it and receives the same response. This makes retrying
+writes safe, e.g. after a timeout.
+
+A key is bound to the request it was first used with (method, path, query
+and body); reusing it for a different request is rejected with 422.
+Server errors (5xx, including load shedding) are not stored, so the request
+can be retried under the same key. Neither are responses with a body over
+``IDEMPOTENCY_MAX_RESPONSE_BYTES``, which keeps the store's memory bounded;
+repeats of such a request are executed again.
+
+The default store is an in-process LRU cache, so keys are only recognised by
+the worker that handled the original request; plug in a shared
+:class:`~app.cache.CacheBackend` with :func:`set_store` to cover all workers.
+"""
+import asyncio
+import hashlib
+import os
+from typing import NamedTuple, Optional
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.cache import CacheBackend, TTLCache
+from app.metrics import IDEMPOTENCY_REQUESTS
+
+IDEMPOTENCY_ENABLED = os.getenv("IDEMPOTENCY_ENABLED", "true").lower() == "true"
+
+# Seconds a response is kept for its key, and maximum number of stored keys
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_STORE_SIZE = int(os.getenv("IDEMPOTENCY_STORE_SIZE", "10000"))
+
+# Largest response body that is stored for a key, in bytes
+IDEMPOTENCY_MAX_RESPONSE_BYTES = int(os.getenv("IDEMPOTENCY_MAX_RESPONSE_BYTES", "1048576"))
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+REPLAYED_HEADER = (b"idempotent-replayed", b"true")
+MAX_KEY_LENGTH = 255
+
+IDEMPOTENCY_PATH_PREFIX = "/items"
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+
+class StoredResponse(NamedTuple):
+    """A response kept for an idempotency key, with the fingerprint of its request."""
+    
+    fingerprint: str
+    status: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+
+
+store: CacheBackend = TTLCache(maxsize=IDEMPOTENCY_STORE_SIZE, ttl=IDEMPOTENCY_TTL_SECONDS)
+
+
+def set_store(backend: CacheBackend) -> None:
+    """Replace the response store, e.g. with a backend shared between workers."""
+    global store
+    store = backend
+
+
+class _RequestBody:
+    """
+    The request body, hashed into the request fingerprint as it is read.
+    
+    The body is read ahead when a stored or in-flight response has to be
+    compared with the request, and before the response starts for any part
+    the app left unread; otherwise it streams through to the app.
+    """
+    
+    def __init__(self, scope: Scope, receive: Receive):
+        self._receive = receive
+        self._hash = hashlib.sha256(f"{scope['method']} {scope['path']}?{scope['query_string'].decode()}\n".encode())
+        self._buffer: list[bytes] = []
+        self._complete = False
+    
+    def _consume(self, message: Message) -> None:
+        self._hash.update(message.get("body", b""))
+        self._complete = not message.get("more_body", False)
+    
+    async def fingerprint(self) -> Optional[str]:
+        """Read the rest of the body and return the fingerprint, or ``None`` if the client disconnected."""
+        while not self._complete:
+            message = await self._receive()
+            if message["type"] == "http.disconnect":
+                return None
+            self._consume(message)
+            self._buffer.append(message.get("body", b""))
+        return self._hash.hexdigest()
+    
+    async def receive(self) -> Message:
+        """``receive`` for the app: the read-ahead part of the body first, then the rest."""
+        if self._buffer:
+            body = b"".join(self._buffer)
+            self._buffer.clear()
+            return {"type": "http.request", "body": body, "more_body": not self._complete}
+        if self._complete:
+            return await self._receive()
+        message = await self._receive()
+        if message["type"] == "http.request":
+            self._consume(message)
+        return message
+
+
+def _error(status_code: int, detail: str) -> JSONResponse:
+    return JSONResponse({"detail": detail}, status_code=status_code)
+
+
+async def _replay(stored: StoredResponse, send: Send) -> None:
+    await send({
+        "type": "http.response.start",
+        "status": stored.status,
+        "headers": [*stored.headers, REPLAYED_HEADER],
+    })
+    await send({"type": "http.response.body", "body": stored.body})
+
+
+class IdempotencyMiddleware:
+    """Execute writing item requests with the same ``Idempotency-Key`` at most once."""
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        # Futures of the requests currently executing, by key; resolved to their stored response
+        self._in_flight: dict[str, asyncio.Future] = {}
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in WRITE_METHODS
+            or not scope["path"].startswith(IDEMPOTENCY_PATH_PREFIX)
+        ):
+            await self.app(scope, receive, send)
+            return
+        
+        key = Headers(scope=scope).get(IDEMPOTENCY_HEADER)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not 0 < len(key) <= MAX_KEY_LENGTH:
+            await _error(400, f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters")(scope, receive, send)
+            return
+        
+        body = _RequestBody(scope, receive)
+        while True:
+            stored = store.get(key)
+            in_flight = self._in_flight.get(key) if stored is None else None
+            if stored is None and in_flight is None:
+                break
+            
+            fingerprint = await body.fingerprint()
+            if fingerprint is None:
+                return
+            if stored is None:
+                # A concurrent duplicate: wait for the original instead of running it again
+                stored = await asyncio.shield(in_flight)
+                if stored is None:
+                    # The original failed without a storable response; run this one
+                    continue
+                result = "collapsed"
+            else:
+                result = "replayed"
+            
+            if stored.fingerprint != fingerprint:
+                IDEMPOTENCY_REQUESTS.labels("mismatch").inc()
+                await _error(422, "Idempotency-Key was already used for a different request")(scope, receive, send)
+                return
+            IDEMPOTENCY_REQUESTS.labels(result).inc()
+            await _replay(stored, send)
+            return
+        
+        await self._execute(key, body, scope, send)
+    
+    async def _execute(self, key: str, body: _RequestBody, scope: Scope, send: Send) -> None:
+        """Run the request, storing its response under ``key`` unless it is a server error or too large."""
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        IDEMPOTENCY_REQUESTS.labels("executed").inc()
+        start: Optional[Message] = None
+        fingerprint: Optional[str] = None
+        chunks: Optional[list[bytes]] = []
+        size = 0
+        
+        async def send_capturing(message: Message) -> None:
+            nonlocal start, fingerprint, chunks, size
+            if message["type"] == "http.response.start":
+                # Read any body the app left unread while the server still delivers it
+                fingerprint = await body.fingerprint()
+                # Copied before outer middleware (compression, cookies) edits the headers in place
+                start = {**message, "headers": list(message.get("headers", []))}
+            elif message["type"] == "http.response.body" and chunks is not None:
+                chunk = message.get("body", b"")
+                size += len(chunk)
+                if size > IDEMPOTENCY_MAX_RESPONSE_BYTES:
+                    # Too large to store; stop holding on to the body
+                    chunks = None
+                else:
+                    chunks.append(chunk)
+            await send(message)
+        
+        stored = None
+        try:
+            await self.app(scope, body.receive, send_capturing)
+            if start is not None and start["status"] < 500 and fingerprint is not None and chunks is not None:
+                stored = StoredResponse(fingerprint, start["status"], start["headers"], b"".join(chunks))
+                store.set(key, stored)
+        finally:
+            del self._in_flight[key]
+            future.set_result(stored)
@@ -1,18 +1,42 @@
 """FastAPI application entry point."""
 import os
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Response, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import engine, Base
-from app.routers import items
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from app import admission, changes, crud, group_commit, profiling, replicas
+from app.idempotency import IDEMPOTENCY_ENABLED, IdempotencyMiddleware
+from app.compression import COMPRESSION_ENABLED, CompressionMiddleware
+from app.metrics import PrometheusMiddleware
+from app.database import engine, async_engine, Base, SessionLocal, ASYNC_DB_ENABLED
+from app.routers import items, items_async
+
+
+# The schema is managed by Alembic (python -m app.migrate). Creating it at
+# startup is only meant for local development and throwaway databases.
+AUTO_CREATE_SCHEMA = os.getenv("AUTO_CREATE_SCHEMA", "false").lower() == "true"
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Initialize database on startup."""
-    # Create database tables
-    Base.metadata.create_all(bind=engine)
+    if AUTO_CREATE_SCHEMA:
+        # Create database tables
+        Base.metadata.create_all(bind=engine)
+        # Backfill summary rollups for databases created before they existed
+        with SessionLocal() as db:
+            crud.ensure_rollups(db)
+    group_commit.start()
+    changes.start()
     yield
+    changes.stop()
+    group_commit.stop()
+    await replicas.dispose()
+    if async_engine is not None:
+        await async_engine.dispose()
 
 
 # Create FastAPI application
@@ -23,6 +47,12 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Innermost, so queueing time shows up in the route metrics and rejections get CORS headers
+admission.install(app)
+if IDEMPOTENCY_ENABLED:
+    # Outside admission control, so repeats are answered without taking a slot
+    app.add_middleware(IdempotencyMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -31,8 +61,18 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(PrometheusMiddleware)
+profiling.install(app)
+if replicas.replica_set is not None and replicas.READ_YOUR_WRITES_SECONDS > 0:
+    app.add_middleware(replicas.ReadYourWritesMiddleware)
+if COMPRESSION_ENABLED:
+    # Added last so it wraps everything else and compresses the final body
+    app.add_middleware(CompressionMiddleware)
 
 # Include routers
+if ASYNC_DB_ENABLED:
+    # Registered first so the async routes take precedence over their sync twins
+    app.include_router(items_async.router)
 app.include_router(items.router)
 
 
@@ -47,15 +87,37 @@ async def root():
     }
 
 
+def _ping_database() -> bool:
+    """Run a trivial query to check that the database is reachable."""
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        return True
+    except SQLAlchemyError:
+        return False
+
+
 @app.get("/health", tags=["health"])
-async def health_check():
-    """Health check endpoint."""
+async def health_check(response: Response):
+    """Health check endpoint; responds with 503 when the database is unreachable."""
+    if not await run_in_threadpool(_ping_database):
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {
+            "status": "unhealthy",
+            "database": "disconnected"
+        }
     return {
         "status": "healthy",
         "database": "connected"
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics."""
+    return Response(generate_latest(), headers={"Content-Type": CONTENT_TYPE_LATEST})
+
+
 if __name__ == "__main__":
     import uvicorn
     
@@ -0,0 +1,228 @@
+"""Prometheus metrics for HTTP routes and the database.
+
+Metrics are kept per process. When running several uvicorn workers, scrape
+each worker (e.g. one pod per worker) or configure the client's multiprocess
+mode.
+"""
+import time
+from typing import Iterator
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being handled by route",
+    ["method", "route"],
+)
+
+POOL_CHECKOUT_DURATION = Histogram(
+    "db_pool_checkout_seconds",
+    "Time to obtain a connection from the pool, including waiting for a free one",
+    ["engine"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+POOL_CHECKOUT_FAILURES = Counter(
+    "db_pool_checkout_failures_total",
+    "Pool checkouts that failed, e.g. because the pool timed out",
+    ["engine"],
+)
+QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Statement execution time by statement type",
+    ["engine", "statement"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+READ_SESSIONS = Counter(
+    "db_read_sessions_total",
+    "Sessions opened for read-only routes by the engine serving them",
+    ["engine"],
+)
+REPLICA_EJECTIONS = Counter(
+    "db_replica_ejections_total",
+    "Times a read replica was taken out of rotation after a connection failure",
+    ["engine"],
+)
+
+IDEMPOTENCY_REQUESTS = Counter(
+    "idempotency_requests_total",
+    "Writes with an Idempotency-Key by outcome (executed, replayed, collapsed, mismatch)",
+    ["result"],
+)
+
+CHANGE_FEED_SUBSCRIBERS = Gauge(
+    "change_feed_subscribers",
+    "Open GET /items/changes streams",
+)
+CHANGE_FEED_EVENTS = Counter(
+    "change_feed_events_total",
+    "Item change events received by the change feed broker by type",
+    ["event"],
+)
+CHANGE_FEED_OVERFLOWS = Counter(
+    "change_feed_overflows_total",
+    "Change feed streams closed because the client fell too far behind",
+)
+
+ADMISSION_IN_FLIGHT = Gauge(
+    "admission_in_flight",
+    "Item requests admitted and being handled by class",
+    ["class"],
+)
+ADMISSION_QUEUED = Gauge(
+    "admission_queued",
+    "Item requests waiting for admission by class",
+    ["class"],
+)
+ADMISSION_QUEUE_WAIT = Histogram(
+    "admission_queue_wait_seconds",
+    "Time item requests waited for admission, including rejected ones",
+    ["class"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+ADMISSION_REJECTIONS = Counter(
+    "admission_rejections_total",
+    "Item requests rejected with 503 by class and reason (queue_full, timeout, deadline)",
+    ["class", "reason"],
+)
+
+STATEMENT_TYPES = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "COPY")
+
+# Engine name of each instrumented pool, for the pool usage collector
+_pools: dict[str, QueuePool] = {}
+
+
+class _TimedPoolMixin:
+    """Record how long each checkout takes in ``db_pool_checkout_seconds``."""
+    
+    engine_name = "primary"
+    
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except Exception:
+            POOL_CHECKOUT_FAILURES.labels(self.engine_name).inc()
+            raise
+        POOL_CHECKOUT_DURATION.labels(self.engine_name).observe(time.perf_counter() - start)
+        return connection
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    """``QueuePool`` that records checkout latency."""
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    """``AsyncAdaptedQueuePool`` that records checkout latency."""
+
+
+def _statement_type(statement: str) -> str:
+    """Leading keyword of a SQL statement, for the ``statement`` label."""
+    words = statement.split(None, 1)
+    keyword = words[0].upper() if words else ""
+    return keyword if keyword in STATEMENT_TYPES else "OTHER"
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """
+    Attach metrics to an engine.
+    
+    Statement timings are taken from cursor execution events; pool usage is
+    read when metrics are scraped. Pass ``engine.sync_engine`` for async engines.
+    """
+    pool = engine.pool
+    if isinstance(pool, _TimedPoolMixin):
+        pool.engine_name = name
+    if isinstance(pool, QueuePool):
+        _pools[name] = pool
+    
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+    
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+        QUERY_DURATION.labels(name, _statement_type(statement)).observe(elapsed)
+    
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start_time"):
+            conn.info["query_start_time"].pop()
+
+
+class PoolCollector(Collector):
+    """Report the current size and usage of instrumented connection pools."""
+    
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        size = GaugeMetricFamily("db_pool_size", "Configured pool size", labels=["engine"])
+        checked_out = GaugeMetricFamily(
+            "db_pool_checked_out", "Connections currently checked out", labels=["engine"]
+        )
+        overflow = GaugeMetricFamily(
+            "db_pool_overflow", "Connections open beyond the pool size", labels=["engine"]
+        )
+        for name, pool in _pools.items():
+            size.add_metric([name], pool.size())
+            checked_out.add_metric([name], pool.checkedout())
+            overflow.add_metric([name], max(pool.overflow(), 0))
+        yield size
+        yield checked_out
+        yield overflow
+
+
+REGISTRY.register(PoolCollector())
+
+
+class PrometheusMiddleware:
+    """ASGI middleware recording latency and in-flight requests per route template."""
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    def _route(self, scope: Scope) -> str:
+        """Path template of the route serving the request, to keep label cardinality bounded."""
+        partial = None
+        for route in scope["app"].router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path
+            if match == Match.PARTIAL and partial is None:
+                partial = route.path
+        return partial or "unmatched"
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        method = scope["method"]
+        route = self._route(scope)
+        status_code = 500
+        
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        in_progress = REQUESTS_IN_PROGRESS.labels(method, route)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUEST_DURATION.labels(method, route, str(status_code)).observe(time.perf_counter() - start)
+            in_progress.dec()
@@ -0,0 +1,22 @@
+"""One-shot schema migration entry point.
+
+Run before starting the API (e.g. as a Kubernetes Job or init container)
+so that application replicas never issue DDL at startup::
+
+    python -m app.migrate
+"""
+import os
+from alembic import command
+from alembic.config import Config
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+
+
+def main() -> None:
+    """Upgrade the database schema to the latest revision."""
+    config = Config(ALEMBIC_INI)
+    command.upgrade(config, "head")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,8 @@
 """SQLAlchemy database models."""
 import enum
+from datetime import datetime, timezone
 from decimal import Decimal
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, Numeric
+from sqlalchemy import DDL, Column, Integer, String, Text, DateTime, Enum, Numeric, Index, event
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -19,19 +20,147 @@ class RecordTypeEnum(str, enum.Enum):
     EXPENSE = "expense"
 
 
+def _utcnow() -> datetime:
+    """Current UTC time, to the microsecond (SQLite's CURRENT_TIMESTAMP has whole seconds)."""
+    return datetime.now(timezone.utc)
+
+
 class Item(Base):
     """Item model for storing financial records."""
     
     __tablename__ = "items"
     
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(255), nullable=False, index=True)
     description = Column(Text, nullable=True)
-    category = Column(Enum(CategoryEnum), nullable=True, index=True)
-    record_type = Column(Enum(RecordTypeEnum), nullable=False, index=True)
+    category = Column(Enum(CategoryEnum), nullable=True)
+    record_type = Column(Enum(RecordTypeEnum), nullable=False)
     sum = Column(Numeric(precision=10, scale=2), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    # Set by the application so that writes within one second still get distinct
+    # timestamps, and with them distinct ETags; COPY imports use the server default
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=_utcnow,
+        server_default=func.now(),
+        onupdate=_utcnow,
+        nullable=False
+    )
+    
+    # Indexes match the list query shape (WHERE category AND record_type ORDER BY id)
+    # and time-range scans; they are created by the Alembic migrations.
+    __table_args__ = (
+        Index("ix_items_category_record_type_id", "category", "record_type", "id"),
+        Index("ix_items_record_type_id", "record_type", "id"),
+        Index("ix_items_created_at_id", "created_at", "id"),
+        # Covering index for filtered time-range aggregates over sum
+        Index(
+            "ix_items_category_record_type_created_at",
+            "category",
+            "record_type",
+            "created_at",
+            postgresql_include=["sum"],
+        ),
+    )
     
     def __repr__(self):
         return f"<Item(id={self.id}, name='{self.name}', type='{self.record_type}', sum={self.sum})>"
+
+
+# Text search configuration for the PostgreSQL search vector
+SEARCH_CONFIG = "english"
+
+# Search objects created by the DDL below, outside the mapped metadata. FTS5
+# also creates shadow tables named after its table (items_fts_data, ...).
+SEARCH_VECTOR_COLUMN = "search_vector"
+SEARCH_VECTOR_INDEX = "ix_items_search_vector"
+SEARCH_FTS_TABLE = "items_fts"
+
+# Full-text index over name and description, maintained by the database on
+# every write. On PostgreSQL it is a generated tsvector column (not mapped, so
+# items are never loaded with it) under a GIN index; on SQLite, used for local
+# development, an external-content FTS5 table kept in step by triggers.
+# Migration 0003 creates the same objects on existing databases.
+POSTGRES_SEARCH_DDL = (
+    f"""
+    ALTER TABLE items ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX ix_items_search_vector ON items USING gin (search_vector)",
+)
+
+SQLITE_SEARCH_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+        name, description, content='items', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS items_fts_insert AFTER INSERT ON items BEGIN
+        INSERT INTO items_fts (rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS items_fts_delete AFTER DELETE ON items BEGIN
+        INSERT INTO items_fts (items_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS items_fts_update AFTER UPDATE OF name, description ON items BEGIN
+        INSERT INTO items_fts (items_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO items_fts (rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+)
+
+for _statement in POSTGRES_SEARCH_DDL:
+    event.listen(Item.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+for _statement in SQLITE_SEARCH_DDL:
+    event.listen(Item.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+# The FTS table is not part of the metadata, so drop it with items
+event.listen(Item.__table__, "before_drop", DDL("DROP TABLE IF EXISTS items_fts").execute_if(dialect="sqlite"))
+
+
+class ItemRollup(Base):
+    """Running count and total of items per category and record type.
+    
+    Kept up to date incrementally by the CRUD write functions, so summaries
+    read a handful of rows instead of scanning ``items``. A key may be split
+    across several rows; readers always aggregate with ``GROUP BY``.
+    """
+    
+    __tablename__ = "item_rollups"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    category = Column(Enum(CategoryEnum), nullable=True)
+    record_type = Column(Enum(RecordTypeEnum), nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+    total = Column(Numeric(precision=16, scale=2), nullable=False, default=0)
+    
+    __table_args__ = (
+        Index("ix_item_rollups_category_record_type", "category", "record_type"),
+    )
+    
+    def __repr__(self):
+        return f"<ItemRollup(category='{self.category}', type='{self.record_type}', count={self.count}, total={self.total})>"
+
+
+def include_object(object, name, type_, reflected, compare_to) -> bool:
+    """
+    Alembic ``include_object`` hook that leaves the search objects out of autogenerate.
+    
+    They are created by the DDL above (and migration 0003) rather than
+    declared in the metadata, so autogenerate would otherwise propose
+    dropping them.
+    """
+    if type_ == "table":
+        return not (name == SEARCH_FTS_TABLE or name.startswith(f"{SEARCH_FTS_TABLE}_"))
+    if type_ == "column":
+        return not (name == SEARCH_VECTOR_COLUMN and object.table.name == Item.__tablename__)
+    if type_ == "index":
+        return name != SEARCH_VECTOR_INDEX
+    return True
@@ -0,0 +1,270 @@
+"""Request profiling: per-request query statistics, budgets and cProfile reports.
+
+Enabled with ``PROFILING_ENABLED``. Every SQL statement executed while
+handling a request is counted and timed through SQLAlchemy events, and
+requests that exceed the query-count or duration budget, or repeat the same
+statement (a typical N+1 pattern), are logged as one JSON line with the
+offending statements. Sending ``X-Profile`` replaces the response body with
+a cProfile report of the endpoint.
+
+When disabled, no event listeners, middleware or endpoint wrappers are
+installed, so there is no per-request or per-statement cost.
+"""
+import cProfile
+import functools
+import inspect
+import io
+import json
+import logging
+import os
+import pstats
+import time
+from contextvars import ContextVar
+from typing import Callable, Optional
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+
+# Requests over any budget are logged with their statements
+PROFILE_MAX_QUERIES = int(os.getenv("PROFILE_MAX_QUERIES", "10"))
+PROFILE_MAX_REQUEST_MS = float(os.getenv("PROFILE_MAX_REQUEST_MS", "500"))
+# Executing the same statement this many times in one request is reported as N+1
+PROFILE_MAX_REPEATS = int(os.getenv("PROFILE_MAX_REPEATS", "5"))
+# Single statements slower than this are logged on their own
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+
+# Number of functions listed in X-Profile reports and statements in budget logs
+PROFILE_REPORT_LINES = 40
+PROFILE_LOG_STATEMENTS = 10
+
+PROFILE_SORT_KEYS = ("cumulative", "tottime", "calls", "ncalls")
+
+
+class RequestProfile:
+    """Statements executed while handling one request."""
+    
+    __slots__ = ("statements", "query_count", "query_time", "profile_sort", "report")
+    
+    def __init__(self, profile_sort: Optional[str] = None):
+        # statement -> [executions, total seconds, slowest seconds]
+        self.statements: dict[str, list] = {}
+        self.query_count = 0
+        self.query_time = 0.0
+        self.profile_sort = profile_sort
+        self.report: Optional[str] = None
+    
+    def record(self, statement: str, elapsed: float) -> None:
+        self.query_count += 1
+        self.query_time += elapsed
+        stats = self.statements.get(statement)
+        if stats is None:
+            self.statements[statement] = [1, elapsed, elapsed]
+        else:
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] = max(stats[2], elapsed)
+    
+    def repeated(self) -> list[str]:
+        """Statements executed at least ``PROFILE_MAX_REPEATS`` times."""
+        return [statement for statement, (count, _, _) in self.statements.items() if count >= PROFILE_MAX_REPEATS]
+    
+    def top_statements(self) -> list[dict]:
+        """The statements with the largest total time."""
+        ordered = sorted(self.statements.items(), key=lambda entry: entry[1][1], reverse=True)
+        return [
+            {
+                "statement": statement,
+                "count": count,
+                "total_ms": round(total * 1000, 3),
+                "max_ms": round(slowest * 1000, 3),
+            }
+            for statement, (count, total, slowest) in ordered[:PROFILE_LOG_STATEMENTS]
+        ]
+
+
+_current: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("profile_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["profile_start_time"].pop()
+    profile = _current.get()
+    if profile is not None:
+        profile.record(statement, elapsed)
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        logger.warning(json.dumps({
+            "event": "slow_query",
+            "statement": statement,
+            "duration_ms": round(elapsed * 1000, 3),
+            "executemany": executemany,
+        }))
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("profile_start_time"):
+        conn.info["profile_start_time"].pop()
+
+
+def _profiled(endpoint: Callable) -> Callable:
+    """
+    Wrap an endpoint so that it runs under cProfile when the request asked for it.
+    
+    The profiler has to run on the thread executing the endpoint, which for
+    sync endpoints is a threadpool worker, so it cannot be started by the
+    middleware.
+    """
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            profile = _current.get()
+            if profile is None or profile.profile_sort is None:
+                return await endpoint(*args, **kwargs)
+            # Also captures other requests interleaved on the event loop meanwhile
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                profiler.disable()
+                profile.report = _format_report(profiler, profile.profile_sort)
+        async_wrapper.__profiled__ = True
+        return async_wrapper
+    
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        profile = _current.get()
+        if profile is None or profile.profile_sort is None:
+            return endpoint(*args, **kwargs)
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(endpoint, *args, **kwargs)
+        finally:
+            profile.report = _format_report(profiler, profile.profile_sort)
+    wrapper.__profiled__ = True
+    return wrapper
+
+
+def _format_report(profiler: cProfile.Profile, sort: str) -> str:
+    buffer = io.StringIO()
+    pstats.Stats(profiler, stream=buffer).sort_stats(sort).print_stats(PROFILE_REPORT_LINES)
+    return buffer.getvalue()
+
+
+class ProfiledRoute(APIRoute):
+    """Route class whose endpoints can be profiled with ``X-Profile`` when profiling is enabled."""
+    
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        # Routes are re-created when a router is included; wrap only once
+        if PROFILING_ENABLED and not getattr(endpoint, "__profiled__", False):
+            endpoint = _profiled(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware collecting the statements of each request.
+    
+    Adds ``Server-Timing`` and ``X-Query-Count`` headers, logs requests over
+    budget and, for requests with ``X-Profile``, sends the cProfile report
+    (sorted by the header value if it is a pstats sort key) instead of the body.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        profile_header = Headers(scope=scope).get("x-profile")
+        profile_sort = None
+        if profile_header is not None:
+            profile_sort = profile_header if profile_header in PROFILE_SORT_KEYS else "cumulative"
+        profile = RequestProfile(profile_sort)
+        token = _current.set(profile)
+        start = time.perf_counter()
+        status_code = 500
+        response_start: Optional[Message] = None
+        
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_start
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers["X-Query-Count"] = str(profile.query_count)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={profile.query_time * 1000:.3f};desc="{profile.query_count} queries"'
+                )
+                if profile_sort is not None:
+                    # Sent with the report once the endpoint has finished
+                    response_start = message
+                    return
+            elif message["type"] == "http.response.body" and response_start is not None:
+                if message.get("more_body", False):
+                    return
+                body = (profile.report or "No profile was recorded for this route.\n").encode()
+                headers = MutableHeaders(scope=response_start)
+                headers["Content-Type"] = "text/plain; charset=utf-8"
+                headers["Content-Length"] = str(len(body))
+                for name in ("content-encoding", "etag", "last-modified"):
+                    if name in headers:
+                        del headers[name]
+                await send(response_start)
+                await send({"type": "http.response.body", "body": body})
+                return
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            self._check_budget(scope, status_code, time.perf_counter() - start, profile)
+    
+    @staticmethod
+    def _check_budget(scope: Scope, status_code: int, elapsed: float, profile: RequestProfile) -> None:
+        """Log the request as structured JSON if it went over a budget."""
+        violations = []
+        if profile.query_count > PROFILE_MAX_QUERIES:
+            violations.append("query_count")
+        if elapsed * 1000 > PROFILE_MAX_REQUEST_MS:
+            violations.append("duration")
+        repeated = profile.repeated()
+        if repeated:
+            violations.append("repeated_statements")
+        if not violations:
+            return
+        
+        logger.warning(json.dumps({
+            "event": "request_over_budget",
+            "violations": violations,
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": status_code,
+            "duration_ms": round(elapsed * 1000, 3),
+            "query_count": profile.query_count,
+            "query_time_ms": round(profile.query_time * 1000, 3),
+            "repeated_statements": repeated,
+            "statements": profile.top_statements(),
+        }))
+
+
+def install(app) -> None:
+    """Register the statement listeners and middleware if profiling is enabled."""
+    if not PROFILING_ENABLED:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+    app.add_middleware(ProfilingMiddleware)
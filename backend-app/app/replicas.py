@@ -0,0 +1,277 @@
+"""Read-replica routing for read-only routes.
+
+With ``DATABASE_REPLICA_URLS`` set, read-only routes take their session from
+:func:`get_read_db` (or :func:`get_async_read_db`) instead of ``get_db``. Each
+session is bound to a healthy replica picked round-robin or by fewest
+sessions in use; writes keep using the primary.
+
+A replica that cannot be reached is ejected for ``REPLICA_EJECT_SECONDS`` and
+the read moves on to the next one, falling back to the primary when none is
+left. After a successful write, the client gets a ``primary_until`` cookie,
+and its reads go to the primary for ``READ_YOUR_WRITES_SECONDS`` so it sees
+its own changes despite replication lag.
+
+For local testing, replicas can be copies of a SQLite database file:
+``DATABASE_REPLICA_URLS=sqlite:///./replica1.db,sqlite:///./replica2.db``.
+"""
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterator, Optional
+from fastapi import Request
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.database import ASYNC_DB_ENABLED, AsyncSessionLocal, SessionLocal, _async_url
+from app.metrics import (
+    READ_SESSIONS,
+    REPLICA_EJECTIONS,
+    TimedAsyncAdaptedQueuePool,
+    TimedQueuePool,
+    instrument_engine,
+)
+
+logger = logging.getLogger(__name__)
+
+# Comma-separated replica URLs; async URLs are derived unless given explicitly
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+ASYNC_DATABASE_REPLICA_URLS = [
+    url.strip() for url in os.getenv("ASYNC_DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+] or [_async_url(url) for url in DATABASE_REPLICA_URLS]
+
+# "round_robin" or "least_connections"
+REPLICA_SELECTION = os.getenv("REPLICA_SELECTION", "round_robin")
+REPLICA_SELECTIONS = ("round_robin", "least_connections")
+if REPLICA_SELECTION not in REPLICA_SELECTIONS:
+    raise ValueError(f"REPLICA_SELECTION must be one of {', '.join(REPLICA_SELECTIONS)}, got {REPLICA_SELECTION!r}")
+
+# Seconds an unreachable replica is skipped before it is tried again
+REPLICA_EJECT_SECONDS = float(os.getenv("REPLICA_EJECT_SECONDS", "30"))
+
+# Seconds a client's reads stay on the primary after it writes (0 disables)
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+
+READ_YOUR_WRITES_COOKIE = "primary_until"
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class Replica:
+    """One read replica with its engines and routing state."""
+    
+    def __init__(self, name: str, url: str, async_url: Optional[str] = None):
+        self.name = name
+        self.engine = create_engine(url, pool_pre_ping=True, pool_size=5, max_overflow=10, poolclass=TimedQueuePool)
+        instrument_engine(self.engine, name)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        
+        self.async_engine = None
+        self.AsyncSessionLocal = None
+        if async_url is not None:
+            async_pool_options = {}
+            if make_url(async_url).get_backend_name() != "sqlite":
+                async_pool_options = {
+                    "pool_size": int(os.getenv("ASYNC_DB_POOL_SIZE", "20")),
+                    "max_overflow": int(os.getenv("ASYNC_DB_MAX_OVERFLOW", "20")),
+                    "poolclass": TimedAsyncAdaptedQueuePool,
+                }
+            self.async_engine = create_async_engine(async_url, pool_pre_ping=True, **async_pool_options)
+            instrument_engine(self.async_engine.sync_engine, f"{name}_async")
+            self.AsyncSessionLocal = async_sessionmaker(self.async_engine, autoflush=False, expire_on_commit=False)
+        
+        # Sessions currently open on this replica, for least-connections selection
+        self.in_use = 0
+        self.ejected_until = 0.0
+    
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.ejected_until
+
+
+class ReplicaSet:
+    """Picks replicas for read sessions and tracks their health."""
+    
+    def __init__(self, replicas: list[Replica], selection: str = REPLICA_SELECTION):
+        self.replicas = replicas
+        self.selection = selection
+        self._lock = threading.Lock()
+        self._next = 0
+    
+    def candidates(self) -> list[Replica]:
+        """Healthy replicas in the order they should be tried."""
+        with self._lock:
+            healthy = [replica for replica in self.replicas if replica.healthy]
+            if self.selection == "least_connections":
+                return sorted(healthy, key=lambda replica: replica.in_use)
+            # Round robin: rotate the starting point on every read
+            start = self._next % len(healthy) if healthy else 0
+            self._next += 1
+            return healthy[start:] + healthy[:start]
+    
+    def acquire(self, replica: Replica) -> None:
+        with self._lock:
+            replica.in_use += 1
+    
+    def release(self, replica: Replica) -> None:
+        with self._lock:
+            replica.in_use -= 1
+    
+    def eject(self, replica: Replica, exc: BaseException) -> None:
+        """Skip ``replica`` for ``REPLICA_EJECT_SECONDS``."""
+        replica.ejected_until = time.monotonic() + REPLICA_EJECT_SECONDS
+        REPLICA_EJECTIONS.labels(replica.name).inc()
+        logger.warning("Ejecting %s for %.0fs: %s", replica.name, REPLICA_EJECT_SECONDS, exc)
+
+
+replica_set: Optional[ReplicaSet] = None
+if DATABASE_REPLICA_URLS:
+    replica_set = ReplicaSet([
+        Replica(
+            f"replica{index}",
+            url,
+            ASYNC_DATABASE_REPLICA_URLS[index - 1] if ASYNC_DB_ENABLED else None
+        )
+        for index, url in enumerate(DATABASE_REPLICA_URLS, start=1)
+    ])
+
+
+def prefers_primary(request: Request) -> bool:
+    """Whether the client wrote recently enough to read from the primary."""
+    try:
+        return float(request.cookies.get(READ_YOUR_WRITES_COOKIE, "0")) > time.time()
+    except ValueError:
+        return False
+
+
+@contextmanager
+def read_session(primary: bool = False) -> Iterator[Session]:
+    """
+    Open a session for read-only work on a healthy replica.
+    
+    Uses the primary when ``primary`` is true, no replicas are configured or
+    none is reachable. A replica whose connection fails, while opening or
+    during the read, is ejected.
+    """
+    replica = None
+    if replica_set is not None and not primary:
+        for candidate in replica_set.candidates():
+            db = candidate.SessionLocal()
+            try:
+                # Connect now, so an unreachable replica is skipped instead of failing the request
+                db.connection()
+            except SQLAlchemyError as exc:
+                db.close()
+                replica_set.eject(candidate, exc)
+                continue
+            replica = candidate
+            break
+    
+    if replica is None:
+        db = SessionLocal()
+    else:
+        replica_set.acquire(replica)
+    # Lets callers avoid caching data that may lag behind the primary
+    db.info["replica"] = replica.name if replica is not None else None
+    READ_SESSIONS.labels(replica.name if replica is not None else "primary").inc()
+    try:
+        yield db
+    except DBAPIError as exc:
+        if replica is not None and exc.connection_invalidated:
+            replica_set.eject(replica, exc)
+        raise
+    finally:
+        if replica is not None:
+            replica_set.release(replica)
+        db.close()
+
+
+@asynccontextmanager
+async def async_read_session(primary: bool = False) -> AsyncIterator[AsyncSession]:
+    """Async variant of :func:`read_session`."""
+    replica = None
+    if replica_set is not None and not primary:
+        for candidate in replica_set.candidates():
+            if candidate.AsyncSessionLocal is None:
+                continue
+            db = candidate.AsyncSessionLocal()
+            try:
+                await db.connection()
+            except SQLAlchemyError as exc:
+                await db.close()
+                replica_set.eject(candidate, exc)
+                continue
+            replica = candidate
+            break
+    
+    if replica is None:
+        db = AsyncSessionLocal()
+    else:
+        replica_set.acquire(replica)
+    db.info["replica"] = replica.name if replica is not None else None
+    READ_SESSIONS.labels(replica.name if replica is not None else "primary").inc()
+    try:
+        yield db
+    except DBAPIError as exc:
+        if replica is not None and exc.connection_invalidated:
+            replica_set.eject(replica, exc)
+        raise
+    finally:
+        if replica is not None:
+            replica_set.release(replica)
+        await db.close()
+
+
+# Dependency to get a read-only database session
+def get_read_db(request: Request):
+    """Get a session for read-only routes, on a replica when possible."""
+    with read_session(primary=prefers_primary(request)) as db:
+        yield db
+
+
+# Dependency to get a read-only async database session
+async def get_async_read_db(request: Request):
+    """Get an async session for read-only routes, on a replica when possible."""
+    async with async_read_session(primary=prefers_primary(request)) as db:
+        yield db
+
+
+async def dispose() -> None:
+    """Close the replica connection pools."""
+    if replica_set is None:
+        return
+    for replica in replica_set.replicas:
+        replica.engine.dispose()
+        if replica.async_engine is not None:
+            await replica.async_engine.dispose()
+
+
+class ReadYourWritesMiddleware:
+    """Mark clients that just wrote, so their reads go to the primary for a while."""
+    
+    def __init__(self, app: ASGIApp, window: float = READ_YOUR_WRITES_SECONDS):
+        self.app = app
+        self.window = window
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+        
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Set-Cookie",
+                    f"{READ_YOUR_WRITES_COOKIE}={time.time() + self.window:.3f}; "
+                    f"Max-Age={math.ceil(self.window)}; Path=/; HttpOnly; SameSite=Lax"
+                )
+            await send(message)
+        
+        await self.app(scope, receive, send_with_cookie)
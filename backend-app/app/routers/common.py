@@ -0,0 +1,249 @@
+"""Request parsing and response helpers shared by the sync and async item routers."""
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Optional
+import msgpack
+import orjson
+from fastapi import HTTPException, status, Request, Response
+from app import conditional, crud, schemas
+from app.models import RecordTypeEnum
+from app.pagination import encode_cursor, decode_cursor
+from app.timeutil import as_utc
+
+# Accept values that select MessagePack item responses; the first is sent back
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+def group_commit_timeout() -> HTTPException:
+    """503 for a create whose group-commit batch did not finish in time; the item may still be stored."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Timed out waiting for the record to be stored"
+    )
+
+
+def decode_cursor_param(cursor: Optional[str]) -> Optional[int]:
+    """Decode the ``cursor`` query parameter, rejecting malformed tokens with 400."""
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def time_range(
+    created_from: Optional[datetime],
+    created_to: Optional[datetime]
+) -> tuple[Optional[datetime], Optional[datetime]]:
+    """
+    Normalize the ``from``/``to`` query parameters to UTC.
+    
+    Timestamps without an offset are taken as UTC. An empty or reversed
+    range is rejected with 400.
+    """
+    created_from = as_utc(created_from) if created_from is not None else None
+    created_to = as_utc(created_to) if created_to is not None else None
+    if created_from is not None and created_to is not None and created_from >= created_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'from' must be earlier than 'to'"
+        )
+    return created_from, created_to
+
+
+def require_filters(*filters: Any) -> None:
+    """Reject bulk writes without any filter, which would touch every item."""
+    if all(value is None for value in filters):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one filter is required"
+        )
+
+
+def search_query(q: str) -> str:
+    """Strip a search query, rejecting one without any words."""
+    q = q.strip()
+    if not q:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="q must contain at least one word"
+        )
+    return q
+
+
+def fields_param(fields: Optional[str]) -> Optional[tuple[str, ...]]:
+    """
+    Parse a comma-separated ``fields`` parameter into item attribute names.
+    
+    Returns ``None`` (all fields) when the parameter is absent or empty.
+    ``id`` is always included.
+    """
+    names = {name.strip() for name in (fields or "").split(",") if name.strip()}
+    if not names:
+        return None
+    
+    unknown = names.difference(crud.ITEM_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+    return tuple(name for name in crud.ITEM_FIELDS if name == "id" or name in names)
+
+
+def _item_json(row, fields: Optional[tuple[str, ...]] = None) -> dict:
+    """
+    Serialize an item row exactly like ``ItemResponse`` would, limited to ``fields``.
+    
+    Rows come straight from the database, so re-validating them through the
+    response model is skipped; ``sum`` is rendered as a string and enums by
+    value, matching Pydantic's JSON output.
+    """
+    item = {name: getattr(row, name) for name in fields or crud.ITEM_FIELDS}
+    if "sum" in item:
+        item["sum"] = str(item["sum"])
+    return item
+
+
+def _wants_msgpack(request: Request) -> bool:
+    """Whether the request's ``Accept`` header opts into MessagePack."""
+    for media_range in request.headers.get("accept", "").split(","):
+        media_type, _, params = media_range.partition(";")
+        if media_type.strip().lower() not in MSGPACK_MEDIA_TYPES:
+            continue
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+def _msgpack_default(value: Any) -> Any:
+    """Encode values MessagePack has no type for the way they appear in JSON responses."""
+    if isinstance(value, datetime):
+        text = value.isoformat()
+        return text[:-6] + "Z" if text.endswith("+00:00") else text
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Cannot encode {type(value).__name__} as MessagePack")
+
+
+def _encoded_response(request: Request, content: Any, headers: Optional[dict[str, str]] = None) -> Response:
+    """
+    Encode ``content`` as MessagePack if the client asked for it, otherwise as JSON.
+    
+    JSON is written with orjson; UTC datetimes use a ``Z`` suffix like Pydantic.
+    """
+    headers = {**(headers or {}), "Vary": "Accept"}
+    if _wants_msgpack(request):
+        return Response(
+            msgpack.packb(content, default=_msgpack_default),
+            media_type=MSGPACK_MEDIA_TYPES[0],
+            headers=headers
+        )
+    return Response(
+        orjson.dumps(content, option=orjson.OPT_UTC_Z),
+        media_type="application/json",
+        headers=headers
+    )
+
+
+def item_list(
+    request: Request,
+    rows: list,
+    total: int,
+    skip: int,
+    limit: int,
+    fields: Optional[tuple[str, ...]] = None
+) -> Response:
+    """
+    Build a list response from ``limit + 1`` fetched item rows.
+    
+    The response is encoded directly instead of through ``schemas.ItemList``,
+    which stays the documented response model of the list endpoints. With
+    ``fields``, items only carry those attributes.
+    """
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].id)
+    
+    return _encoded_response(request, {
+        "items": [_item_json(row, fields) for row in rows],
+        "total": total,
+        "skip": skip,
+        "limit": limit,
+        "next_cursor": next_cursor
+    })
+
+
+def search_results(
+    request: Request,
+    rows: list,
+    total: int,
+    skip: int,
+    limit: int,
+    fields: Optional[tuple[str, ...]] = None
+) -> Response:
+    """Build a search response, encoded like :func:`item_list` and documented as ``schemas.ItemSearchResults``."""
+    return _encoded_response(request, {
+        "items": [_item_json(row, fields) for row in rows],
+        "total": total,
+        "skip": skip,
+        "limit": limit
+    })
+
+
+def item_summary(rows) -> schemas.ItemSummary:
+    """Build a summary response from grouped rollup rows."""
+    groups = [
+        schemas.SummaryGroup(category=row.category, record_type=row.record_type, count=row.count, total=row.total)
+        for row in rows
+    ]
+    total_income = sum((g.total for g in groups if g.record_type == RecordTypeEnum.INCOME), Decimal("0.00"))
+    total_expense = sum((g.total for g in groups if g.record_type == RecordTypeEnum.EXPENSE), Decimal("0.00"))
+    return schemas.ItemSummary(
+        groups=groups,
+        total_income=total_income,
+        total_expense=total_expense,
+        balance=total_income - total_expense
+    )
+
+
+def timeseries(bucket: str, rows) -> schemas.TimeSeries:
+    """Build a time-series response from grouped bucket rows."""
+    points = [
+        schemas.TimeSeriesPoint(
+            bucket=row.bucket,
+            income=row.income,
+            expense=row.expense,
+            balance=Decimal(row.income) - Decimal(row.expense),
+            count=row.count
+        )
+        for row in rows
+    ]
+    return schemas.TimeSeries(bucket=bucket, points=points)
+
+
+def conditional_item_response(
+    request: Request,
+    response: Response,
+    item: Any,
+    fields: Optional[tuple[str, ...]] = None
+):
+    """Attach validator headers, answering with 304 if the client's copy is current."""
+    headers = conditional.cache_headers(item.id, item.updated_at)
+    if conditional.is_not_modified(request, item.id, item.updated_at):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if fields is not None or _wants_msgpack(request):
+        return _encoded_response(request, _item_json(item, fields), headers)
+    response.headers.update(headers)
+    return item
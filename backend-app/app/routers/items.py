@@ -1,16 +1,46 @@
 """API endpoints for items."""
-from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import csv
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, AsyncIterator, Iterator, Literal, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import Session
-from app import crud, schemas
+from app import changes, conditional, crud, group_commit, schemas
 from app.database import get_db
 from app.models import CategoryEnum, RecordTypeEnum
+from app.profiling import ProfiledRoute
+from app.replicas import get_read_db, prefers_primary, read_session
+from app.routers.common import (
+    conditional_item_response,
+    decode_cursor_param,
+    fields_param,
+    group_commit_timeout,
+    item_list,
+    item_summary,
+    require_filters,
+    search_query,
+    search_results,
+    time_range,
+    timeseries,
+)
 
 router = APIRouter(
     prefix="/items",
     tags=["items"],
+    route_class=ProfiledRoute,
 )
 
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/jsonl", "application/json-lines")
+
+EXPORT_FIELDS = ("id", "name", "description", "category", "record_type", "sum", "created_at", "updated_at")
+
 
 @router.post("/", response_model=schemas.ItemResponse, status_code=status.HTTP_201_CREATED)
 def create_item(
@@ -25,59 +55,435 @@ def create_item(
     - **category**: Category - food, car, or rent (optional)
     - **record_type**: Record type - income or expense (required)
     - **sum**: Amount in currency (required, must be positive)
+    
+    With group commit enabled, concurrent creates share one INSERT and one
+    transaction.
     """
+    if group_commit.committer is not None:
+        try:
+            return group_commit.committer.submit(item).result(timeout=group_commit.GROUP_COMMIT_TIMEOUT_SECONDS)
+        except TimeoutError:
+            raise group_commit_timeout()
     return crud.create_item(db=db, item=item)
 
 
+async def _read_bulk_rows(request: Request) -> AsyncIterator[tuple[int, Any]]:
+    """
+    Yield ``(index, row)`` pairs from a JSON array or NDJSON request body.
+    
+    NDJSON bodies are parsed line by line as they arrive. Lines that are not
+    valid JSON are yielded as :class:`ValueError` instances.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    
+    if content_type not in NDJSON_MEDIA_TYPES:
+        try:
+            rows = await request.json()
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Request body must be a JSON array"
+            )
+        if not isinstance(rows, list):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Request body must be a JSON array"
+            )
+        for index, row in enumerate(rows):
+            yield index, row
+        return
+    
+    index = 0
+    pending = b""
+    async for chunk in request.stream():
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield index, _parse_ndjson_line(line)
+                index += 1
+    if pending.strip():
+        yield index, _parse_ndjson_line(pending)
+
+
+def _parse_ndjson_line(line: bytes) -> Any:
+    """Parse a single NDJSON line, returning the error instead of raising."""
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return ValueError(f"Invalid JSON: {e}")
+
+
+@router.post(
+    "/bulk",
+    response_model=schemas.BulkCreateResult,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                media_type: {
+                    "schema": {"type": "array", "items": {"$ref": "#/components/schemas/ItemCreate"}}
+                }
+                for media_type in ("application/json", NDJSON_MEDIA_TYPES[0])
+            },
+        }
+    },
+)
+async def create_items_bulk(
+    request: Request,
+    batch_size: int = Query(crud.BULK_BATCH_SIZE, ge=1, le=10000, description="Rows per INSERT batch"),
+    use_copy: bool = Query(False, description="Load batches with COPY on PostgreSQL (no IDs returned)"),
+    db: Session = Depends(get_db)
+):
+    """
+    Create many financial records in one request.
+    
+    The body is either a JSON array of records or, with `Content-Type: application/x-ndjson`,
+    one record per line. Each record has the same fields as `POST /items/`.
+    
+    - **batch_size**: Rows per multi-row INSERT (default: 1000, max: 10000)
+    - **use_copy**: Use PostgreSQL COPY instead of INSERT ... RETURNING (optional)
+    
+    Rows are validated individually and inserted in batches. Rejected rows are
+    reported in `errors` by position without aborting the rest of the request.
+    """
+    result = schemas.BulkCreateResult(inserted=0)
+    use_copy = use_copy and db.get_bind().dialect.name == "postgresql"
+    batch: list[tuple[int, schemas.ItemCreate]] = []
+    
+    async def flush():
+        if use_copy:
+            try:
+                result.inserted += await run_in_threadpool(crud.copy_items, db, [item for _, item in batch])
+                batch.clear()
+                return
+            except DBAPIError:
+                # COPY rejects the whole batch; retry it row-aware
+                pass
+        ids, errors = await run_in_threadpool(crud.bulk_create_items, db, list(batch))
+        batch.clear()
+        result.inserted += len(ids)
+        result.ids.extend(ids)
+        result.errors.extend(schemas.BulkItemError(index=index, detail=error) for index, error in errors)
+    
+    async for index, row in _read_bulk_rows(request):
+        if isinstance(row, ValueError):
+            result.errors.append(schemas.BulkItemError(index=index, detail=str(row)))
+            continue
+        try:
+            batch.append((index, schemas.ItemCreate.model_validate(row)))
+        except ValidationError as e:
+            result.errors.append(schemas.BulkItemError(
+                index=index,
+                detail=e.errors(include_url=False, include_context=False)
+            ))
+            continue
+        if len(batch) >= batch_size:
+            await flush()
+    
+    if batch:
+        await flush()
+    return result
+
+
 @router.get("/", response_model=schemas.ItemList)
 def read_items(
+    request: Request,
     skip: int = Query(0, ge=0, description="Number of items to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of items to return"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor (overrides skip)"),
     category: Optional[CategoryEnum] = Query(None, description="Filter by category (food, car, rent)"),
     record_type: Optional[RecordTypeEnum] = Query(None, description="Filter by record type (income, expense)"),
-    db: Session = Depends(get_db)
+    created_from: Optional[datetime] = Query(None, alias="from", description="Only items created at or after this time (ISO 8601)"),
+    created_to: Optional[datetime] = Query(None, alias="to", description="Only items created before this time (ISO 8601)"),
+    approximate_total: bool = Query(False, description="Return an estimated total from planner statistics"),
+    fields: Optional[str] = Query(None, description="Comma-separated item fields to return, e.g. id,name,sum (id is always included)"),
+    db: Session = Depends(get_read_db)
 ):
     """
     Retrieve a list of financial records with pagination and optional filtering.
     
     - **skip**: Number of items to skip (default: 0)
     - **limit**: Maximum number of items to return (default: 100, max: 1000)
+    - **cursor**: Opaque cursor returned as `next_cursor` by the previous page (optional)
+    - **category**: Filter by category - food, car, or rent (optional)
+    - **record_type**: Filter by record type - income or expense (optional)
+    - **from** / **to**: Only items created in `[from, to)` (optional, ISO 8601, UTC if no offset)
+    - **approximate_total**: Estimate `total` instead of counting exactly (optional)
+    - **fields**: Only select and return these item fields (optional)
+    """
+    after_id = decode_cursor_param(cursor)
+    created_from, created_to = time_range(created_from, created_to)
+    field_names = fields_param(fields)
+    
+    # Fetch one extra row to find out whether another page exists
+    if after_id is None and not approximate_total:
+        # Page and exact total in one round trip
+        items, total = crud.get_items_with_total(
+            db=db,
+            skip=skip,
+            limit=limit + 1,
+            category=category,
+            record_type=record_type,
+            created_from=created_from,
+            created_to=created_to,
+            fields=field_names
+        )
+    else:
+        items = crud.get_items(
+            db=db,
+            skip=skip,
+            limit=limit + 1,
+            category=category,
+            record_type=record_type,
+            created_from=created_from,
+            created_to=created_to,
+            after_id=after_id,
+            fields=field_names
+        )
+        count = crud.get_items_count_estimate if approximate_total else crud.get_items_count
+        total = count(
+            db=db,
+            category=category,
+            record_type=record_type,
+            created_from=created_from,
+            created_to=created_to
+        )
+    
+    return item_list(request, items, total, skip if cursor is None else 0, limit, field_names)
+
+
+def _export_value(value: Any) -> Any:
+    """Convert a column value to the representation used in API responses."""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _export_lines(
+    export_format: str,
+    category: Optional[CategoryEnum],
+    record_type: Optional[RecordTypeEnum],
+    created_from: Optional[datetime],
+    created_to: Optional[datetime],
+    primary: bool = False
+) -> Iterator[str]:
+    """Render matching items as NDJSON or CSV, one chunk per fetched batch."""
+    # The request-scoped session is closed before a streaming body is sent
+    with read_session(primary=primary) as db:
+        if export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_FIELDS)
+            for rows in crud.stream_items(db, category, record_type, created_from, created_to):
+                writer.writerows(
+                    ["" if value is None else _export_value(value) for value in row]
+                    for row in rows
+                )
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                # Header of an empty export
+                yield buffer.getvalue()
+        else:
+            for rows in crud.stream_items(db, category, record_type, created_from, created_to):
+                yield "".join(
+                    json.dumps(dict(zip(EXPORT_FIELDS, map(_export_value, row)))) + "\n"
+                    for row in rows
+                )
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}, "text/csv": {}}}},
+)
+def export_items(
+    request: Request,
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format", description="Export format (ndjson, csv)"),
+    category: Optional[CategoryEnum] = Query(None, description="Filter by category (food, car, rent)"),
+    record_type: Optional[RecordTypeEnum] = Query(None, description="Filter by record type (income, expense)"),
+    created_from: Optional[datetime] = Query(None, alias="from", description="Only items created at or after this time (ISO 8601)"),
+    created_to: Optional[datetime] = Query(None, alias="to", description="Only items created before this time (ISO 8601)"),
+):
+    """
+    Export all matching financial records as a stream.
+    
+    - **format**: `ndjson` (one JSON record per line, default) or `csv`
     - **category**: Filter by category - food, car, or rent (optional)
     - **record_type**: Filter by record type - income or expense (optional)
+    - **from** / **to**: Only items created in `[from, to)` (optional, ISO 8601, UTC if no offset)
+    
+    Records are read through a server-side cursor and streamed as they are
+    fetched, so memory use does not grow with the number of records.
+    """
+    created_from, created_to = time_range(created_from, created_to)
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _export_lines(export_format, category, record_type, created_from, created_to, prefers_primary(request)),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="items.{export_format}"'}
+    )
+
+
+@router.get("/summary", response_model=schemas.ItemSummary)
+def read_summary(
+    category: Optional[CategoryEnum] = Query(None, description="Filter by category (food, car, rent)"),
+    record_type: Optional[RecordTypeEnum] = Query(None, description="Filter by record type (income, expense)"),
+    db: Session = Depends(get_read_db)
+):
     """
-    items = crud.get_items(db=db, skip=skip, limit=limit, category=category, record_type=record_type)
-    total = crud.get_items_count(db=db, category=category, record_type=record_type)
-    return schemas.ItemList(
-        items=items,
-        total=total,
+    Get counts and totals of financial records grouped by category and record type.
+    
+    - **category**: Filter by category - food, car, or rent (optional)
+    - **record_type**: Filter by record type - income or expense (optional)
+    
+    Totals cover all matching records, not just one page, and are read from
+    incrementally maintained rollups.
+    """
+    return item_summary(crud.get_summary(db=db, category=category, record_type=record_type))
+
+
+@router.get("/timeseries", response_model=schemas.TimeSeries)
+def read_timeseries(
+    bucket: Literal["day", "week", "month"] = Query("day", description="Bucket size (day, week, month)"),
+    category: Optional[CategoryEnum] = Query(None, description="Filter by category (food, car, rent)"),
+    record_type: Optional[RecordTypeEnum] = Query(None, description="Filter by record type (income, expense)"),
+    created_from: Optional[datetime] = Query(None, alias="from", description="Only items created at or after this time (ISO 8601)"),
+    created_to: Optional[datetime] = Query(None, alias="to", description="Only items created before this time (ISO 8601)"),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Get income and expense totals per day, week or month.
+    
+    - **bucket**: `day` (default), `week` (starting on Monday) or `month`
+    - **category**: Filter by category - food, car, or rent (optional)
+    - **record_type**: Filter by record type - income or expense (optional)
+    - **from** / **to**: Only items created in `[from, to)` (optional, ISO 8601, UTC if no offset)
+    
+    Buckets are computed in UTC and buckets without records are omitted.
+    """
+    created_from, created_to = time_range(created_from, created_to)
+    rows = crud.get_timeseries(
+        db=db,
+        bucket=bucket,
+        category=category,
+        record_type=record_type,
+        created_from=created_from,
+        created_to=created_to
+    )
+    return timeseries(bucket, rows)
+
+
+@router.get("/search", response_model=schemas.ItemSearchResults)
+def search_items(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=256, description="Words to search for in names and descriptions"),
+    skip: int = Query(0, ge=0, description="Number of results to skip"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of results to return"),
+    category: Optional[CategoryEnum] = Query(None, description="Filter by category (food, car, rent)"),
+    record_type: Optional[RecordTypeEnum] = Query(None, description="Filter by record type (income, expense)"),
+    created_from: Optional[datetime] = Query(None, alias="from", description="Only items created at or after this time (ISO 8601)"),
+    created_to: Optional[datetime] = Query(None, alias="to", description="Only items created before this time (ISO 8601)"),
+    fields: Optional[str] = Query(None, description="Comma-separated item fields to return, e.g. id,name,sum (id is always included)"),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Full-text search over record names and descriptions, best matches first.
+    
+    - **q**: Words to search for; all of them must match. On PostgreSQL, quoted
+      phrases, `or` and `-word` are also understood, and words are stemmed
+    - **skip** / **limit**: Pagination over the ranked results (default limit: 20, max: 100)
+    - **category**, **record_type**, **from** / **to**: Same filters as the list endpoint (optional)
+    - **fields**: Only select and return these item fields (optional)
+    
+    Matches in the name rank above matches in the description.
+    """
+    q = search_query(q)
+    created_from, created_to = time_range(created_from, created_to)
+    field_names = fields_param(fields)
+    rows, total = crud.search_items(
+        db=db,
+        q=q,
         skip=skip,
-        limit=limit
+        limit=limit,
+        category=category,
+        record_type=record_type,
+        created_from=created_from,
+        created_to=created_to,
+        fields=field_names
+    )
+    return search_results(request, rows, total, skip, limit, field_names)
+
+
+@router.get(
+    "/changes",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def stream_changes(
+    last_event_id: Optional[str] = Header(None, description="ID of the last event received, to resume after it")
+):
+    """
+    Stream created, updated and deleted financial records as Server-Sent Events.
+    
+    Each event's `data` is the record as returned by `GET /items/{item_id}`
+    (only `id` for `deleted`). A `reset` event means changes cannot be listed
+    one by one (bulk writes, or a resume from an event that is no longer
+    buffered) and the client should refetch what it shows.
+    
+    Browsers' `EventSource` reconnects by itself and resumes with the
+    `Last-Event-ID` header. Streams are closed periodically and when the
+    client falls too far behind, so clients are expected to reconnect.
+    """
+    return StreamingResponse(
+        changes.broker.stream(last_event_id),
+        media_type="text/event-stream",
+        # Proxies must not buffer or cache the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
 
 @router.get("/{item_id}", response_model=schemas.ItemResponse)
 def read_item(
     item_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None, description="Comma-separated item fields to return, e.g. id,name,sum (id is always included)"),
+    db: Session = Depends(get_read_db)
 ):
     """
     Get a specific item by ID.
     
     - **item_id**: ID of the item to retrieve
+    - **fields**: Only select and return these item fields (optional)
+    
+    Responses carry `ETag` and `Last-Modified` headers; a request with a
+    matching `If-None-Match` (or `If-Modified-Since`) gets `304 Not Modified`.
     """
-    db_item = crud.get_item(db=db, item_id=item_id)
-    if db_item is None:
+    field_names = fields_param(fields)
+    if field_names is None:
+        item = crud.get_item_cached(db=db, item_id=item_id)
+    else:
+        item = crud.get_item_fields(db=db, item_id=item_id, fields=field_names)
+    if item is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Item with id {item_id} not found"
         )
-    return db_item
+    return conditional_item_response(request, response, item, field_names)
 
 
 @router.put("/{item_id}", response_model=schemas.ItemResponse)
 def update_item(
     item_id: int,
     item: schemas.ItemUpdate,
+    response: Response,
     db: Session = Depends(get_db)
 ):
     """
@@ -96,6 +502,7 @@ def update_item(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Item with id {item_id} not found"
         )
+    response.headers.update(conditional.cache_headers(db_item.id, db_item.updated_at))
     return db_item
 
 
@@ -116,3 +523,71 @@ def delete_item(
             detail=f"Item with id {item_id} not found"
         )
     return None
+
+
+@router.patch("/", response_model=schemas.BulkUpdateResult)
+def update_items(
+    item: schemas.ItemUpdate,
+    category: Optional[CategoryEnum] = Query(None, description="Filter by category (food, car, rent)"),
+    record_type: Optional[RecordTypeEnum] = Query(None, description="Filter by record type (income, expense)"),
+    created_from: Optional[datetime] = Query(None, alias="from", description="Only items created at or after this time (ISO 8601)"),
+    created_to: Optional[datetime] = Query(None, alias="to", description="Only items created before this time (ISO 8601)"),
+    db: Session = Depends(get_db)
+):
+    """
+    Apply the same change to every financial record matching the filters.
+    
+    - **category**: Filter by category - food, car, or rent (optional)
+    - **record_type**: Filter by record type - income or expense (optional)
+    - **from** / **to**: Only items created in `[from, to)` (optional, ISO 8601, UTC if no offset)
+    
+    At least one filter is required. The body takes the same fields as
+    `PUT /items/{item_id}`; all matching records are changed by a single
+    `UPDATE` statement.
+    """
+    require_filters(category, record_type, created_from, created_to)
+    created_from, created_to = time_range(created_from, created_to)
+    if not item.model_fields_set:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No fields to update"
+        )
+    updated = crud.update_items(
+        db=db,
+        item=item,
+        category=category,
+        record_type=record_type,
+        created_from=created_from,
+        created_to=created_to
+    )
+    return schemas.BulkUpdateResult(updated=updated)
+
+
+@router.delete("/", response_model=schemas.BulkDeleteResult)
+def delete_items(
+    category: Optional[CategoryEnum] = Query(None, description="Filter by category (food, car, rent)"),
+    record_type: Optional[RecordTypeEnum] = Query(None, description="Filter by record type (income, expense)"),
+    created_from: Optional[datetime] = Query(None, alias="from", description="Only items created at or after this time (ISO 8601)"),
+    created_to: Optional[datetime] = Query(None, alias="to", description="Only items created before this time (ISO 8601)"),
+    db: Session = Depends(get_db)
+):
+    """
+    Delete every financial record matching the filters.
+    
+    - **category**: Filter by category - food, car, or rent (optional)
+    - **record_type**: Filter by record type - income or expense (optional)
+    - **from** / **to**: Only items created in `[from, to)` (optional, ISO 8601, UTC if no offset)
+    
+    At least one filter is required. All matching records are removed by a
+    single `DELETE` statement.
+    """
+    require_filters(category, record_type, created_from, created_to)
+    created_from, created_to = time_range(created_from, created_to)
+    deleted = crud.delete_items(
+        db=db,
+        category=category,
+        record_type=record_type,
+        created_from=created_from,
+        created_to=created_to
+    )
+    return schemas.BulkDeleteResult(deleted=deleted)
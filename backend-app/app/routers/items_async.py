@@ -0,0 +1,276 @@
+"""Async API endpoints for items.
+
+Served instead of the matching routes in :mod:`app.routers.items` when
+``ASYNC_DB_ENABLED`` is set. The request and response contracts are the
+same, so these routes are left out of the OpenAPI schema. Item paths use
+the ``int`` convertor so that static sync routes such as ``/items/export``
+are not shadowed.
+"""
+import asyncio
+from datetime import datetime
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import conditional, crud_async, group_commit, schemas
+from app.database import get_async_db
+from app.models import CategoryEnum, RecordTypeEnum
+from app.profiling import ProfiledRoute
+from app.replicas import get_async_read_db
+from app.routers.common import (
+    conditional_item_response,
+    decode_cursor_param,
+    fields_param,
+    group_commit_timeout,
+    item_list,
+    item_summary,
+    require_filters,
+    search_query,
+    search_results,
+    time_range,
+    timeseries,
+)
+
+router = APIRouter(
+    prefix="/items",
+    tags=["items"],
+    route_class=ProfiledRoute,
+    include_in_schema=False,
+)
+
+
+@router.post("/", response_model=schemas.ItemResponse, status_code=status.HTTP_201_CREATED)
+async def create_item(
+    item: schemas.ItemCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create a new financial record."""
+    if group_commit.committer is not None:
+        future = asyncio.wrap_future(group_commit.committer.submit(item))
+        try:
+            # Shielded, so a timeout leaves the batch to resolve the future
+            return await asyncio.wait_for(asyncio.shield(future), group_commit.GROUP_COMMIT_TIMEOUT_SECONDS)
+        except TimeoutError:
+            raise group_commit_timeout()
+    return await crud_async.create_item(db=db, item=item)
+
+
+@router.get("/", response_model=schemas.ItemList)
+async def read_items(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
+    category: Optional[CategoryEnum] = Query(None),
+    record_type: Optional[RecordTypeEnum] = Query(None),
+    created_from: Optional[datetime] = Query(None, alias="from"),
+    created_to: Optional[datetime] = Query(None, alias="to"),
+    approximate_total: bool = Query(False),
+    fields: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Retrieve a list of financial records with pagination and optional filtering."""
+    after_id = decode_cursor_param(cursor)
+    created_from, created_to = time_range(created_from, created_to)
+    field_names = fields_param(fields)
+    
+    # Fetch one extra row to find out whether another page exists
+    if after_id is None and not approximate_total:
+        items, total = await crud_async.get_items_with_total(
+            db=db,
+            skip=skip,
+            limit=limit + 1,
+            category=category,
+            record_type=record_type,
+            created_from=created_from,
+            created_to=created_to,
+            fields=field_names
+        )
+    else:
+        items = await crud_async.get_items(
+            db=db,
+            skip=skip,
+            limit=limit + 1,
+            category=category,
+            record_type=record_type,
+            created_from=created_from,
+            created_to=created_to,
+            after_id=after_id,
+            fields=field_names
+        )
+        count = crud_async.get_items_count_estimate if approximate_total else crud_async.get_items_count
+        total = await count(
+            db=db,
+            category=category,
+            record_type=record_type,
+            created_from=created_from,
+            created_to=created_to
+        )
+    
+    return item_list(request, items, total, skip if cursor is None else 0, limit, field_names)
+
+
+@router.get("/summary", response_model=schemas.ItemSummary)
+async def read_summary(
+    category: Optional[CategoryEnum] = Query(None),
+    record_type: Optional[RecordTypeEnum] = Query(None),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Get counts and totals of financial records grouped by category and record type."""
+    return item_summary(await crud_async.get_summary(db=db, category=category, record_type=record_type))
+
+
+@router.get("/timeseries", response_model=schemas.TimeSeries)
+async def read_timeseries(
+    bucket: Literal["day", "week", "month"] = Query("day"),
+    category: Optional[CategoryEnum] = Query(None),
+    record_type: Optional[RecordTypeEnum] = Query(None),
+    created_from: Optional[datetime] = Query(None, alias="from"),
+    created_to: Optional[datetime] = Query(None, alias="to"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Get income and expense totals per day, week or month."""
+    created_from, created_to = time_range(created_from, created_to)
+    rows = await crud_async.get_timeseries(
+        db=db,
+        bucket=bucket,
+        category=category,
+        record_type=record_type,
+        created_from=created_from,
+        created_to=created_to
+    )
+    return timeseries(bucket, rows)
+
+
+@router.get("/search", response_model=schemas.ItemSearchResults)
+async def search_items(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=256),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    category: Optional[CategoryEnum] = Query(None),
+    record_type: Optional[RecordTypeEnum] = Query(None),
+    created_from: Optional[datetime] = Query(None, alias="from"),
+    created_to: Optional[datetime] = Query(None, alias="to"),
+    fields: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Full-text search over record names and descriptions, best matches first."""
+    q = search_query(q)
+    created_from, created_to = time_range(created_from, created_to)
+    field_names = fields_param(fields)
+    rows, total = await crud_async.search_items(
+        db=db,
+        q=q,
+        skip=skip,
+        limit=limit,
+        category=category,
+        record_type=record_type,
+        created_from=created_from,
+        created_to=created_to,
+        fields=field_names
+    )
+    return search_results(request, rows, total, skip, limit, field_names)
+
+
+@router.get("/{item_id:int}", response_model=schemas.ItemResponse)
+async def read_item(
+    item_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Get a specific item by ID."""
+    field_names = fields_param(fields)
+    if field_names is None:
+        item = await crud_async.get_item_cached(db=db, item_id=item_id)
+    else:
+        item = await crud_async.get_item_fields(db=db, item_id=item_id, fields=field_names)
+    if item is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Item with id {item_id} not found"
+        )
+    return conditional_item_response(request, response, item, field_names)
+
+
+@router.put("/{item_id:int}", response_model=schemas.ItemResponse)
+async def update_item(
+    item_id: int,
+    item: schemas.ItemUpdate,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Update an existing financial record."""
+    db_item = await crud_async.update_item(db=db, item_id=item_id, item=item)
+    if db_item is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Item with id {item_id} not found"
+        )
+    response.headers.update(conditional.cache_headers(db_item.id, db_item.updated_at))
+    return db_item
+
+
+@router.delete("/{item_id:int}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_item(
+    item_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Delete an item."""
+    success = await crud_async.delete_item(db=db, item_id=item_id)
+    if not success:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Item with id {item_id} not found"
+        )
+    return None
+
+
+@router.patch("/", response_model=schemas.BulkUpdateResult)
+async def update_items(
+    item: schemas.ItemUpdate,
+    category: Optional[CategoryEnum] = Query(None),
+    record_type: Optional[RecordTypeEnum] = Query(None),
+    created_from: Optional[datetime] = Query(None, alias="from"),
+    created_to: Optional[datetime] = Query(None, alias="to"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Apply the same change to every financial record matching the filters."""
+    require_filters(category, record_type, created_from, created_to)
+    created_from, created_to = time_range(created_from, created_to)
+    if not item.model_fields_set:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No fields to update"
+        )
+    updated = await crud_async.update_items(
+        db=db,
+        item=item,
+        category=category,
+        record_type=record_type,
+        created_from=created_from,
+        created_to=created_to
+    )
+    return schemas.BulkUpdateResult(updated=updated)
+
+
+@router.delete("/", response_model=schemas.BulkDeleteResult)
+async def delete_items(
+    category: Optional[CategoryEnum] = Query(None),
+    record_type: Optional[RecordTypeEnum] = Query(None),
+    created_from: Optional[datetime] = Query(None, alias="from"),
+    created_to: Optional[datetime] = Query(None, alias="to"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Delete every financial record matching the filters."""
+    require_filters(category, record_type, created_from, created_to)
+    created_from, created_to = time_range(created_from, created_to)
+    deleted = await crud_async.delete_items(
+        db=db,
+        category=category,
+        record_type=record_type,
+        created_from=created_from,
+        created_to=created_to
+    )
+    return schemas.BulkDeleteResult(deleted=deleted)
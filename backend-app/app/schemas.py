@@ -1,7 +1,7 @@
 """Pydantic schemas for request/response validation."""
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
-from typing import Optional
+from typing import Any, Literal, Optional
 from pydantic import BaseModel, Field, ConfigDict, field_validator
 from app.models import CategoryEnum, RecordTypeEnum
 
@@ -60,3 +60,66 @@ class ItemList(BaseModel):
     total: int
     skip: int
     limit: int
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, if any")
+
+
+class ItemSearchResults(BaseModel):
+    """Schema for a page of full-text search results, best matches first."""
+    items: list[ItemResponse]
+    total: int
+    skip: int
+    limit: int
+
+
+class SummaryGroup(BaseModel):
+    """Schema for totals of one category and record type."""
+    category: Optional[CategoryEnum]
+    record_type: RecordTypeEnum
+    count: int
+    total: Decimal
+
+
+class ItemSummary(BaseModel):
+    """Schema for aggregated totals of financial records."""
+    groups: list[SummaryGroup]
+    total_income: Decimal
+    total_expense: Decimal
+    balance: Decimal
+
+
+class TimeSeriesPoint(BaseModel):
+    """Schema for the totals of one time bucket."""
+    bucket: date = Field(..., description="First day of the bucket")
+    income: Decimal
+    expense: Decimal
+    balance: Decimal
+    count: int
+
+
+class TimeSeries(BaseModel):
+    """Schema for income and expense totals over time."""
+    bucket: Literal["day", "week", "month"]
+    points: list[TimeSeriesPoint]
+
+
+class BulkItemError(BaseModel):
+    """Schema for a rejected row in a bulk request."""
+    index: int = Field(..., description="Zero-based position of the row in the request")
+    detail: Any = Field(..., description="Validation errors or database error message")
+
+
+class BulkCreateResult(BaseModel):
+    """Schema for bulk item creation result."""
+    inserted: int
+    ids: list[int] = Field(default_factory=list, description="IDs of inserted items (empty for COPY)")
+    errors: list[BulkItemError] = Field(default_factory=list)
+
+
+class BulkUpdateResult(BaseModel):
+    """Schema for filter-based bulk update result."""
+    updated: int
+
+
+class BulkDeleteResult(BaseModel):
+    """Schema for filter-based bulk delete result."""
+    deleted: int
@@ -0,0 +1,9 @@
+"""Timestamp helpers shared by the HTTP validators and the item filters."""
+from datetime import datetime, timezone
+
+
+def as_utc(value: datetime) -> datetime:
+    """Treat naive timestamps (e.g. from SQLite or query strings without an offset) as UTC."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
@@ -0,0 +1,5 @@
+"""Benchmark and load-test suite for the backend API and the Flask frontend.
+
+Run with ``python -m benchmarks`` from the ``backend-app`` directory; see the
+README for options.
+"""
@@ -0,0 +1,174 @@
+"""Command line entry point: ``python -m benchmarks``."""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_FRONTEND_DIR = os.path.join(REPO_DIR, "frontend-app")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmark the backend API and the Flask frontend.",
+    )
+    parser.add_argument(
+        "--database-url",
+        help="Database to benchmark against; it is DROPPED and re-created (default: temporary SQLite file)",
+    )
+    parser.add_argument("--items", type=int, default=10000, help="Items to seed (default: 10000)")
+    parser.add_argument("--requests", type=int, default=500, help="Measured requests per scenario (default: 500)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients (default: 8)")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests per scenario (default: 20)")
+    parser.add_argument(
+        "--mode",
+        choices=("inprocess", "uvicorn", "both"),
+        default="both",
+        help="Drive the apps in-process, through real servers, or both (default: both)",
+    )
+    parser.add_argument("--scenarios", help="Comma-separated scenario names to run (default: all)")
+    parser.add_argument("--no-frontend", action="store_true", help="Skip the frontend scenarios")
+    parser.add_argument("--frontend-dir", default=DEFAULT_FRONTEND_DIR, help="Path to frontend-app")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for data and requests (default: 0)")
+    parser.add_argument("--output", default="benchmark-results.json", help="Where to write the results JSON")
+    parser.add_argument("--baseline", help="Results JSON to compare against")
+    parser.add_argument("--save-baseline", help="Also write the results to this path for future comparisons")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.10,
+        help="Relative p95 or throughput change counted as a regression (default: 0.10)",
+    )
+    parser.add_argument(
+        "--fail-on-regression",
+        action="store_true",
+        help="Exit with status 1 when the comparison finds a regression",
+    )
+    return parser.parse_args(argv)
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _load_frontend(frontend_dir: str, backend_url: str):
+    """Import the frontend's ``app.py`` (as ``frontend_app``, to avoid clashing with the backend package)."""
+    os.environ["BACKEND_URL"] = backend_url
+    sys.path.insert(0, frontend_dir)
+    spec = importlib.util.spec_from_file_location("frontend_app", os.path.join(frontend_dir, "app.py"))
+    module = importlib.util.module_from_spec(spec)
+    # Flask finds templates relative to the module registered under this name
+    sys.modules["frontend_app"] = module
+    spec.loader.exec_module(module)
+    return module.app
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'benchmark.db')}"
+    # Must be set before the app modules create their engines
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["AUTO_CREATE_SCHEMA"] = "false"
+    
+    from fastapi.testclient import TestClient
+    from app.main import app as backend_app
+    from benchmarks import runner
+    from benchmarks.compare import compare
+    from benchmarks.scenarios import BACKEND_SCENARIOS, FRONTEND_SCENARIOS, RunState
+    from benchmarks.seed import seed
+    
+    selected = set(args.scenarios.split(",")) if args.scenarios else None
+    backend_scenarios = {
+        name: scenario for name, scenario in BACKEND_SCENARIOS.items() if selected is None or name in selected
+    }
+    frontend_scenarios = {} if args.no_frontend else {
+        name: scenario for name, scenario in FRONTEND_SCENARIOS.items() if selected is None or name in selected
+    }
+    modes = ("inprocess", "uvicorn") if args.mode == "both" else (args.mode,)
+    results: dict[str, dict] = {}
+    
+    def run(prefix: str, driver, scenarios: dict) -> None:
+        state = RunState(args.items, args.seed)
+        for name, scenario in scenarios.items():
+            count = args.requests
+            if name == "delete":
+                # Each delete removes a distinct seeded item
+                count = min(count, max(args.items - args.warmup, 0))
+            print(f"{prefix}/{name}: {count} requests, concurrency {args.concurrency}", file=sys.stderr)
+            results[f"{prefix}/{name}"] = runner.run_scenario(
+                driver, scenario, state, count, args.concurrency, args.warmup
+            )
+    
+    for mode in modes:
+        print(f"Seeding {args.items} items into {database_url}", file=sys.stderr)
+        seed(args.items, args.seed)
+        if mode == "inprocess":
+            with TestClient(backend_app, raise_server_exceptions=False) as client:
+                run("inprocess", runner.ASGIDriver(client), backend_scenarios)
+        else:
+            with runner.backend_server(runner.free_port(), {}) as backend_url:
+                run("uvicorn", runner.HTTPDriver(backend_url, args.concurrency), backend_scenarios)
+    
+    if frontend_scenarios:
+        seed(args.items, args.seed)
+        with runner.backend_server(runner.free_port(), {}) as backend_url:
+            if "inprocess" in modes:
+                frontend_app = _load_frontend(args.frontend_dir, backend_url)
+                run("inprocess", runner.WSGIDriver(frontend_app.test_client()), frontend_scenarios)
+            if "uvicorn" in modes:
+                env = {"BACKEND_URL": backend_url}
+                with runner.frontend_server(args.frontend_dir, runner.free_port(), env) as frontend_url:
+                    run("server", runner.HTTPDriver(frontend_url, args.concurrency), frontend_scenarios)
+    
+    document = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": database_url.split(":", 1)[0],
+            "items": args.items,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "warmup": args.warmup,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w") as f:
+            json.dump(document, f, indent=2)
+        print(f"Results written to {path}", file=sys.stderr)
+    
+    for name, result in results.items():
+        print(
+            f"{name:<34} {result['throughput_rps']:>9.1f} req/s  p50 {result['p50_ms']:>8.2f} ms  "
+            f"p95 {result['p95_ms']:>8.2f} ms  p99 {result['p99_ms']:>8.2f} ms  errors {result['errors']}"
+        )
+    
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        lines, regressions = compare(baseline, document, args.tolerance)
+        print()
+        print("\n".join(lines))
+        if regressions:
+            print(f"\n{len(regressions)} scenario(s) regressed by more than {args.tolerance:.0%}")
+            if args.fail_on_regression:
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""Compare benchmark results against a saved baseline."""
+
+# Latency metrics get worse when they grow, throughput when it shrinks
+LATENCY_METRICS = ("p50_ms", "p95_ms", "p99_ms")
+THROUGHPUT_METRIC = "throughput_rps"
+
+
+def _change(baseline: float, current: float) -> float:
+    """Relative change from ``baseline`` to ``current``."""
+    if not baseline:
+        return 0.0
+    return (current - baseline) / baseline
+
+
+def compare(baseline: dict, current: dict, tolerance: float) -> tuple[list[str], list[str]]:
+    """
+    Compare two result documents scenario by scenario.
+    
+    Returns report lines and the names of regressed scenarios. A scenario
+    regresses when its p95 latency grows or its throughput drops by more than
+    ``tolerance`` (a fraction), or when it has errors the baseline did not.
+    """
+    lines = [
+        f"{'scenario':<34}{'p50 ms':>20}{'p95 ms':>20}{'p99 ms':>20}{'req/s':>20}",
+    ]
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            lines.append(f"{name:<34}(not in baseline)")
+            continue
+        
+        cells = "".join(
+            f"{result[metric]:>11.2f} {_change(base[metric], result[metric]):>+7.1%}"
+            for metric in (*LATENCY_METRICS, THROUGHPUT_METRIC)
+        )
+        flags = []
+        if _change(base["p95_ms"], result["p95_ms"]) > tolerance:
+            flags.append("p95")
+        if -_change(base[THROUGHPUT_METRIC], result[THROUGHPUT_METRIC]) > tolerance:
+            flags.append("throughput")
+        if result["errors"] > base["errors"]:
+            flags.append("errors")
+        if flags:
+            regressions.append(name)
+        
+        marker = f"  REGRESSION ({', '.join(flags)})" if flags else ""
+        lines.append(f"{name:<34}{cells}{marker}")
+    return lines, regressions
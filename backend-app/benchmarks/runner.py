@@ -0,0 +1,154 @@
+"""Drivers that send scenario requests and collect latency statistics."""
+import math
+import os
+import socket
+import subprocess
+import sys
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from benchmarks.scenarios import Request, RunState
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seconds to wait for a server subprocess to answer its health check
+SERVER_START_TIMEOUT = 30
+
+
+class Driver(ABC):
+    """Sends requests to an application and returns the status code."""
+    
+    @abstractmethod
+    def send(self, method: str, path: str, params: Optional[dict], json: Optional[object]) -> int:
+        """Send one request and return its status code."""
+
+
+class ASGIDriver(Driver):
+    """Calls the FastAPI app in-process through Starlette's test client."""
+    
+    def __init__(self, client):
+        self.client = client
+    
+    def send(self, method, path, params, json):
+        return self.client.request(method, path, params=params, json=json).status_code
+
+
+class WSGIDriver(Driver):
+    """Calls the Flask app in-process through its test client."""
+    
+    def __init__(self, client):
+        self.client = client
+    
+    def send(self, method, path, params, json):
+        return self.client.open(path, method=method, query_string=params, json=json).status_code
+
+
+class HTTPDriver(Driver):
+    """Sends real HTTP requests over a pooled keep-alive session."""
+    
+    def __init__(self, base_url: str, pool_size: int):
+        self.base_url = base_url
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+    
+    def send(self, method, path, params, json):
+        return self.session.request(method, f"{self.base_url}{path}", params=params, json=json).status_code
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(p / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def run_scenario(
+    driver: Driver,
+    scenario: Callable[[RunState], Request],
+    state: RunState,
+    requests_count: int,
+    concurrency: int,
+    warmup: int = 0
+) -> dict:
+    """
+    Send ``warmup`` unmeasured requests, then ``requests_count`` measured ones
+    from ``concurrency`` threads, and summarize their latencies.
+    """
+    def call() -> tuple[float, bool]:
+        method, path, params, json = scenario(state)
+        start = time.perf_counter()
+        try:
+            status = driver.send(method, path, params, json)
+        except Exception:
+            # Connection failures and unhandled server errors count as errors
+            status = 0
+        return time.perf_counter() - start, 200 <= status < 400
+    
+    for _ in range(warmup):
+        call()
+    
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        start = time.perf_counter()
+        outcomes = list(executor.map(lambda _: call(), range(requests_count)))
+        elapsed = time.perf_counter() - start
+    
+    latencies = sorted(latency * 1000 for latency, _ in outcomes)
+    return {
+        "requests": requests_count,
+        "errors": sum(1 for _, ok in outcomes if not ok),
+        "duration_s": round(elapsed, 4),
+        "throughput_rps": round(requests_count / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def server(command: list[str], cwd: str, port: int, env: dict) -> Iterator[str]:
+    """Run a server subprocess until the block exits, yielding its base URL."""
+    base_url = f"http://127.0.0.1:{port}"
+    process = subprocess.Popen(command, cwd=cwd, env={**os.environ, **env})
+    try:
+        deadline = time.monotonic() + SERVER_START_TIMEOUT
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {process.returncode}: {' '.join(command)}")
+            try:
+                if requests.get(f"{base_url}/health", timeout=1).ok:
+                    break
+            except requests.RequestException:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Server did not become healthy: {' '.join(command)}")
+            time.sleep(0.2)
+        yield base_url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def backend_server(port: int, env: dict):
+    """Serve the backend with uvicorn in a subprocess."""
+    command = [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"]
+    return server(command, BACKEND_DIR, port, env)
+
+
+def frontend_server(frontend_dir: str, port: int, env: dict):
+    """Serve the frontend with its own entry point in a subprocess."""
+    return server([sys.executable, "app.py"], frontend_dir, port, {**env, "FLASK_PORT": str(port)})
@@ -0,0 +1,88 @@
+"""Request scenarios.
+
+Each scenario turns the shared run state into one request, given as
+``(method, path, params, json)``. Scenarios run in the order listed, so the
+destructive ``delete`` comes last.
+"""
+import random
+import threading
+from decimal import Decimal
+from typing import Any, Callable, Optional
+from app.models import CategoryEnum, RecordTypeEnum
+from app.pagination import encode_cursor
+
+PAGE_SIZE = 20
+
+# Words found in the seeded names and descriptions (see benchmarks.seed)
+SEARCH_TERMS = ("groceries", "fuel", "rent", "salary", "weekly")
+
+Request = tuple[str, str, Optional[dict], Optional[Any]]
+
+
+class RunState:
+    """Information shared by the scenarios of one run."""
+    
+    def __init__(self, items: int, seed_value: int = 0):
+        self.items = items
+        self._rng = random.Random(seed_value)
+        self._lock = threading.Lock()
+        self._next_delete = items
+    
+    def random(self) -> random.Random:
+        """A random generator derived from the run seed, safe to use from one thread."""
+        with self._lock:
+            return random.Random(self._rng.random())
+    
+    def random_id(self) -> int:
+        return self.random().randint(1, self.items)
+    
+    def next_delete_id(self) -> int:
+        """Seeded IDs from the highest down, so each delete removes an existing item."""
+        with self._lock:
+            item_id = self._next_delete
+            self._next_delete -= 1
+        return item_id
+
+
+def _new_item(state: RunState) -> dict:
+    rng = state.random()
+    return {
+        "name": "Benchmark item",
+        "category": rng.choice(list(CategoryEnum)).value,
+        "record_type": rng.choice(list(RecordTypeEnum)).value,
+        "sum": str(Decimal(rng.randint(100, 500000)) / 100),
+    }
+
+
+def _filters(state: RunState) -> dict:
+    rng = state.random()
+    return {
+        "category": rng.choice(list(CategoryEnum)).value,
+        "record_type": rng.choice(list(RecordTypeEnum)).value,
+    }
+
+
+BACKEND_SCENARIOS: dict[str, Callable[[RunState], Request]] = {
+    "list_shallow": lambda state: ("GET", "/items/", {"limit": PAGE_SIZE}, None),
+    "list_deep_offset": lambda state: (
+        "GET", "/items/", {"skip": max(state.items - PAGE_SIZE, 0), "limit": PAGE_SIZE}, None
+    ),
+    "list_deep_cursor": lambda state: (
+        "GET", "/items/", {"cursor": encode_cursor(max(state.items - PAGE_SIZE, 0)), "limit": PAGE_SIZE}, None
+    ),
+    "list_filtered": lambda state: ("GET", "/items/", {**_filters(state), "limit": PAGE_SIZE}, None),
+    "get": lambda state: ("GET", f"/items/{state.random_id()}", None, None),
+    "search": lambda state: (
+        "GET", "/items/search", {"q": state.random().choice(SEARCH_TERMS), "limit": PAGE_SIZE}, None
+    ),
+    "create": lambda state: ("POST", "/items/", None, _new_item(state)),
+    "update": lambda state: (
+        "PUT", f"/items/{state.random_id()}", None, {"sum": str(Decimal(state.random().randint(100, 500000)) / 100)}
+    ),
+    "delete": lambda state: ("DELETE", f"/items/{state.next_delete_id()}", None, None),
+}
+
+FRONTEND_SCENARIOS: dict[str, Callable[[RunState], Request]] = {
+    "frontend_index": lambda state: ("GET", "/", None, None),
+    "frontend_index_filtered": lambda state: ("GET", "/", _filters(state), None),
+}
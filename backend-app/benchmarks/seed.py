@@ -0,0 +1,37 @@
+"""Seed a benchmark database with deterministic items."""
+import random
+from decimal import Decimal
+from app import crud, schemas
+from app.database import Base, SessionLocal, engine
+from app.models import CategoryEnum, RecordTypeEnum
+
+SEED_BATCH_SIZE = 1000
+
+
+def random_item(rng: random.Random, index: int) -> schemas.ItemCreate:
+    """A plausible item; the same ``rng`` state always yields the same item."""
+    return schemas.ItemCreate(
+        name=f"Item {index}",
+        description=rng.choice([None, "Weekly groceries", "Fuel", "Monthly rent", "Salary"]),
+        category=rng.choice([None, *CategoryEnum]),
+        record_type=rng.choice(list(RecordTypeEnum)),
+        sum=Decimal(rng.randint(100, 500000)) / 100,
+    )
+
+
+def seed(items: int, seed_value: int = 0) -> None:
+    """
+    Drop and re-create the schema, then insert ``items`` items.
+    
+    Items get IDs ``1..items`` in insertion order.
+    """
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    
+    rng = random.Random(seed_value)
+    with SessionLocal() as db:
+        crud.ensure_rollups(db)
+        for start in range(0, items, SEED_BATCH_SIZE):
+            batch = [random_item(rng, index) for index in range(start, min(start + SEED_BATCH_SIZE, items))]
+            crud.insert_items(db, batch)
+            db.commit()
@@ -0,0 +1,41 @@
+"""Create items table
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 00:00:00
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "items",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("category", sa.Enum("FOOD", "CAR", "RENT", name="categoryenum"), nullable=True),
+        sa.Column("record_type", sa.Enum("INCOME", "EXPENSE", name="recordtypeenum"), nullable=False),
+        sa.Column("sum", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_items_id", "items", ["id"])
+    op.create_index("ix_items_name", "items", ["name"])
+    op.create_index("ix_items_category", "items", ["category"])
+    op.create_index("ix_items_record_type", "items", ["record_type"])
+
+
+def downgrade() -> None:
+    op.drop_table("items")
+    sa.Enum(name="recordtypeenum").drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name="categoryenum").drop(op.get_bind(), checkfirst=True)
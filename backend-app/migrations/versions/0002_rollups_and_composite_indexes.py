@@ -0,0 +1,107 @@
+"""Add item rollups and composite indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 00:00:01
+
+Adds the summary rollup table (backfilled from items), the composite and
+covering indexes used by the list, export and time-range queries, and
+drops the single-column indexes they make redundant. On PostgreSQL the
+index changes run CONCURRENTLY so that writes are not blocked on large
+tables.
+
+Databases that were bootstrapped by ``create_all`` can be stamped at 0001
+and upgraded: objects that already exist are skipped.
+"""
+from decimal import Decimal
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CATEGORIES = ("FOOD", "CAR", "RENT")
+RECORD_TYPES = ("INCOME", "EXPENSE")
+
+NEW_INDEXES = {
+    "ix_items_category_record_type_id": (["category", "record_type", "id"], {}),
+    "ix_items_record_type_id": (["record_type", "id"], {}),
+    "ix_items_created_at_id": (["created_at", "id"], {}),
+    "ix_items_category_record_type_created_at": (
+        ["category", "record_type", "created_at"],
+        {"postgresql_include": ["sum"]},
+    ),
+}
+
+REDUNDANT_INDEXES = {
+    "ix_items_id": ["id"],
+    "ix_items_category": ["category"],
+    "ix_items_record_type": ["record_type"],
+}
+
+
+def _enum(*values: str, name: str) -> sa.Enum:
+    """Enum column type reusing the PostgreSQL type created with items."""
+    return sa.Enum(*values, name=name).with_variant(
+        postgresql.ENUM(*values, name=name, create_type=False), "postgresql"
+    )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    
+    if not inspector.has_table("item_rollups"):
+        rollups = op.create_table(
+            "item_rollups",
+            sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column("category", _enum(*CATEGORIES, name="categoryenum"), nullable=True),
+            sa.Column("record_type", _enum(*RECORD_TYPES, name="recordtypeenum"), nullable=False),
+            sa.Column("count", sa.Integer(), nullable=False),
+            sa.Column("total", sa.Numeric(precision=16, scale=2), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_item_rollups_category_record_type", "item_rollups", ["category", "record_type"])
+        
+        # Backfill, with a row for every key so writers never need to insert
+        totals = {
+            (category, record_type): (0, Decimal(0))
+            for category in (None, *CATEGORIES)
+            for record_type in RECORD_TYPES
+        }
+        grouped = bind.execute(sa.text(
+            "SELECT category, record_type, count(*), coalesce(sum(sum), 0) "
+            "FROM items GROUP BY category, record_type"
+        ))
+        for category, record_type, count, amount in grouped:
+            totals[(category, record_type)] = (count, Decimal(amount))
+        op.bulk_insert(rollups, [
+            {"category": category, "record_type": record_type, "count": count, "total": amount}
+            for (category, record_type), (count, amount) in totals.items()
+        ])
+    
+    existing = {index["name"] for index in inspector.get_indexes("items")}
+    concurrently = {"postgresql_concurrently": True}
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, (columns, options) in NEW_INDEXES.items():
+            if name not in existing:
+                op.create_index(name, "items", columns, **options, **concurrently)
+        for name in REDUNDANT_INDEXES:
+            if name in existing:
+                op.drop_index(name, table_name="items", **concurrently)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, columns in REDUNDANT_INDEXES.items():
+            op.create_index(name, "items", columns, postgresql_concurrently=True)
+        for name in NEW_INDEXES:
+            op.drop_index(name, table_name="items", postgresql_concurrently=True)
+    op.drop_table("item_rollups")
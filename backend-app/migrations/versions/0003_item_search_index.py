@@ -0,0 +1,100 @@
+"""Add the full-text search index on items
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:02
+
+On PostgreSQL, adds the generated ``search_vector`` tsvector column (name
+weighted above description) and its GIN index. Adding a stored generated
+column rewrites ``items`` under an exclusive lock, so schedule this for a
+quiet period on large tables; the index itself is built CONCURRENTLY.
+
+On SQLite, creates the ``items_fts`` FTS5 table with the triggers that keep
+it in step with ``items``, and indexes the existing rows.
+
+Objects that already exist (e.g. created by ``create_all``) are skipped.
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_CONFIG = "english"
+
+SQLITE_TRIGGERS = {
+    "items_fts_insert": """
+        CREATE TRIGGER items_fts_insert AFTER INSERT ON items BEGIN
+            INSERT INTO items_fts (rowid, name, description) VALUES (new.id, new.name, new.description);
+        END
+    """,
+    "items_fts_delete": """
+        CREATE TRIGGER items_fts_delete AFTER DELETE ON items BEGIN
+            INSERT INTO items_fts (items_fts, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+        END
+    """,
+    "items_fts_update": """
+        CREATE TRIGGER items_fts_update AFTER UPDATE OF name, description ON items BEGIN
+            INSERT INTO items_fts (items_fts, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+            INSERT INTO items_fts (rowid, name, description) VALUES (new.id, new.name, new.description);
+        END
+    """,
+}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    
+    if bind.dialect.name == "postgresql":
+        if "search_vector" not in {column["name"] for column in inspector.get_columns("items")}:
+            op.execute(f"""
+                ALTER TABLE items ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+                    setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(name, '')), 'A') ||
+                    setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')
+                ) STORED
+            """)
+        if "ix_items_search_vector" not in {index["name"] for index in inspector.get_indexes("items")}:
+            # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+            with op.get_context().autocommit_block():
+                op.create_index(
+                    "ix_items_search_vector",
+                    "items",
+                    ["search_vector"],
+                    postgresql_using="gin",
+                    postgresql_concurrently=True,
+                )
+    elif bind.dialect.name == "sqlite":
+        if not inspector.has_table("items_fts"):
+            op.execute("""
+                CREATE VIRTUAL TABLE items_fts USING fts5(
+                    name, description, content='items', content_rowid='id', tokenize='porter unicode61'
+                )
+            """)
+            # Index the rows that are already there
+            op.execute("INSERT INTO items_fts (items_fts) VALUES ('rebuild')")
+        existing = {
+            name for (name,) in bind.execute(sa.text("SELECT name FROM sqlite_master WHERE type = 'trigger'"))
+        }
+        for name, statement in SQLITE_TRIGGERS.items():
+            if name not in existing:
+                op.execute(statement)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.drop_index("ix_items_search_vector", table_name="items", postgresql_concurrently=True)
+        op.drop_column("items", "search_vector")
+    elif bind.dialect.name == "sqlite":
+        for name in SQLITE_TRIGGERS:
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+        op.execute("DROP TABLE IF EXISTS items_fts")
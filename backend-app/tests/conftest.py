@@ -0,0 +1,18 @@
+"""Shared fixtures: the application on a throwaway SQLite database."""
+import os
+import tempfile
+import pytest
+
+# Configure the database before any app module creates its engine
+_db_dir = tempfile.mkdtemp(prefix="backend-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_db_dir, 'test.db')}")
+os.environ.setdefault("AUTO_CREATE_SCHEMA", "true")
+
+
+@pytest.fixture(scope="session")
+def client():
+    """Test client for the app, with the lifespan (schema creation, background workers) running."""
+    from fastapi.testclient import TestClient
+    from app.main import app
+    with TestClient(app) as test_client:
+        yield test_client
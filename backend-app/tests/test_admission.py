@@ -0,0 +1,25 @@
+"""Admission control: client deadlines."""
+import pytest
+from starlette.datastructures import Headers
+from app.admission import DEADLINE_HEADER, _request_deadline
+
+
+@pytest.mark.parametrize("value", ["inf", "-inf", "nan", "-5", "0", "soon"])
+def test_invalid_deadline_is_ignored(value):
+    assert _request_deadline(Headers({DEADLINE_HEADER: value}), 100.0) is None
+
+
+def test_deadline_is_relative_to_start():
+    assert _request_deadline(Headers({DEADLINE_HEADER: "1500"}), 100.0) == 101.5
+
+
+@pytest.mark.parametrize("value", ["inf", "nan", "-5"])
+def test_invalid_deadline_header_does_not_fail_requests(client, value):
+    response = client.get("/items/", headers={DEADLINE_HEADER: value})
+    assert response.status_code == 200
+
+
+def test_expired_deadline_is_shed(client):
+    response = client.get("/items/", headers={DEADLINE_HEADER: "0.001"})
+    assert response.status_code == 503
+    assert response.headers["retry-after"]
@@ -0,0 +1,48 @@
+"""Change feed: events are published only for committed writes."""
+import pytest
+from app import changes, crud, schemas
+from app.database import SessionLocal
+
+
+@pytest.fixture
+def published(client, monkeypatch):
+    events = []
+    monkeypatch.setattr(changes.broker, "publish", events.extend)
+    return events
+
+
+def _item(name):
+    return schemas.ItemCreate(name=name, record_type="expense", sum="3.50")
+
+
+def _created_names(events):
+    return [event.data for event in events if event.event == "created"]
+
+
+def test_rolled_back_savepoint_drops_its_events(published):
+    with SessionLocal() as db:
+        crud.insert_items(db, [_item("kept")])
+        savepoint = db.begin_nested()
+        crud.insert_items(db, [_item("rolled back")])
+        savepoint.rollback()
+        assert published == []
+        db.commit()
+    
+    data = _created_names(published)
+    assert len(data) == 1 and '"kept"' in data[0]
+
+
+def test_released_savepoint_waits_for_the_outer_commit(published):
+    with SessionLocal() as db:
+        with db.begin_nested():
+            crud.insert_items(db, [_item("inner")])
+        assert published == []
+        db.rollback()
+    assert published == []
+    
+    with SessionLocal() as db:
+        with db.begin_nested():
+            with db.begin_nested():
+                crud.insert_items(db, [_item("nested")])
+        db.commit()
+    assert len(_created_names(published)) == 1
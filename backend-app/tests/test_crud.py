@@ -0,0 +1,34 @@
+"""Count cache and window-count helpers shared by the sync and async CRUD modules."""
+from types import SimpleNamespace
+from app import crud, models
+from app.cache import TTLCache
+
+
+def test_page_total_reads_window_count():
+    assert crud.page_total([SimpleNamespace(total=7)], skip=5) == 7
+
+
+def test_empty_first_page_has_no_items():
+    assert crud.page_total([], skip=0) == 0
+
+
+def test_empty_later_page_needs_separate_count():
+    assert crud.page_total([], skip=100) is None
+
+
+def test_count_cache_disabled(monkeypatch):
+    monkeypatch.setattr(crud, "COUNT_CACHE_TTL", 0)
+    key = crud.count_cache_key(models.CategoryEnum.FOOD)
+    crud.store_count(key, 3)
+    assert crud.cached_count(key) is None
+
+
+def test_count_cache_roundtrip_and_invalidation(monkeypatch):
+    monkeypatch.setattr(crud, "COUNT_CACHE_TTL", 60)
+    monkeypatch.setattr(crud, "_count_cache", TTLCache(maxsize=16, ttl=60))
+    key = crud.count_cache_key(models.CategoryEnum.FOOD, models.RecordTypeEnum.EXPENSE)
+    crud.store_count(key, 3)
+    assert crud.cached_count(key) == 3
+    assert crud.cached_count(crud.count_cache_key(models.CategoryEnum.FOOD)) is None
+    crud.invalidate_counts()
+    assert crud.cached_count(key) is None
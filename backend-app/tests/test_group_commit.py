@@ -0,0 +1,49 @@
+"""Group commit: every submitted item is resolved, whatever happens to its batch."""
+import pytest
+from app import schemas
+from app.group_commit import GroupCommitStopped, GroupCommitter
+
+
+def _item(name="Coffee"):
+    return schemas.ItemCreate(name=name, record_type="expense", sum="3.50")
+
+
+@pytest.fixture
+def committer(client):
+    committer = GroupCommitter(max_delay=0.01)
+    committer.start()
+    yield committer
+    committer.stop()
+
+
+def test_items_are_created(committer):
+    futures = [committer.submit(_item(f"item {n}")) for n in range(5)]
+    assert [future.result(timeout=5).name for future in futures] == [f"item {n}" for n in range(5)]
+
+
+def test_writer_survives_a_failed_batch(committer, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("boom")
+    
+    monkeypatch.setattr(schemas.ItemResponse, "model_validate", fail)
+    with pytest.raises(RuntimeError):
+        committer.submit(_item()).result(timeout=5)
+    monkeypatch.undo()
+    assert committer.submit(_item()).result(timeout=5).name == "Coffee"
+
+
+def test_submit_after_stop_fails(client):
+    committer = GroupCommitter()
+    committer.start()
+    committer.stop()
+    with pytest.raises(GroupCommitStopped):
+        committer.submit(_item()).result(timeout=5)
+
+
+def test_stop_fails_items_left_in_the_queue(client):
+    # Never started: nothing consumes the queue
+    committer = GroupCommitter()
+    future = committer.submit(_item())
+    committer.stop()
+    with pytest.raises(GroupCommitStopped):
+        future.result(timeout=5)
@@ -0,0 +1,22 @@
+"""Idempotency-Key replays, and responses too large to store."""
+from app import idempotency
+
+ITEM = {"name": "Coffee", "record_type": "expense", "sum": "3.50"}
+
+
+def test_repeat_is_replayed(client):
+    first = client.post("/items/", json=ITEM, headers={"Idempotency-Key": "replay"})
+    second = client.post("/items/", json=ITEM, headers={"Idempotency-Key": "replay"})
+    assert first.status_code == second.status_code == 201
+    assert second.headers["idempotent-replayed"] == "true"
+    assert second.json()["id"] == first.json()["id"]
+
+
+def test_large_response_is_not_stored(client, monkeypatch):
+    monkeypatch.setattr(idempotency, "IDEMPOTENCY_MAX_RESPONSE_BYTES", 10)
+    first = client.post("/items/", json=ITEM, headers={"Idempotency-Key": "too-large"})
+    second = client.post("/items/", json=ITEM, headers={"Idempotency-Key": "too-large"})
+    assert first.status_code == second.status_code == 201
+    assert "idempotent-replayed" not in second.headers
+    assert second.json()["id"] != first.json()["id"]
+    assert idempotency.store.get("too-large") is None
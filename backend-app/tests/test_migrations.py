@@ -0,0 +1,11 @@
+"""The metadata and the schema created from it agree for Alembic autogenerate."""
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from app import models
+from app.database import Base, engine
+
+
+def test_autogenerate_ignores_search_objects(client):
+    with engine.connect() as connection:
+        context = MigrationContext.configure(connection, opts={"include_object": models.include_object})
+        assert compare_metadata(context, Base.metadata) == []
@@ -1,65 +1,153 @@
 """Flask web application for financial tracking."""
 import os
+import uuid
 from decimal import Decimal, InvalidOperation
-from flask import Flask, render_template, request, redirect, url_for, flash
+from flask import Flask, Response, render_template, request, redirect, url_for, flash, session
 import requests
 from dotenv import load_dotenv
+from backend_client import BackendClient
+from cache import TTLCache
+import metrics
 
 # Load environment variables
 load_dotenv()
 
 app = Flask(__name__)
 app.secret_key = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
+metrics.init_app(app)
+
+# Compile every template at startup rather than on the first request that renders it;
+# Jinja keeps the compiled templates for the life of the process
+for template_name in app.jinja_env.list_templates(extensions=['html']):
+    app.jinja_env.get_template(template_name)
 
 # Backend API configuration
 BACKEND_URL = os.getenv('BACKEND_URL', 'http://localhost:8000')
-API_ITEMS_URL = f"{BACKEND_URL}/items/"
+API_ITEMS_PATH = '/items/'
+API_SUMMARY_PATH = '/items/summary'
+API_CHANGES_PATH = '/items/changes'
+
+# Records per page; the records table loads further pages as it is scrolled
+PAGE_SIZE = int(os.getenv('PAGE_SIZE', 50))
+
+# Item fields shown in the records table
+ITEM_FIELDS = 'id,name,description,category,record_type,sum,created_at'
+
+# Longest wait for data on the relayed change feed; the backend sends keep-alives
+# every CHANGE_FEED_HEARTBEAT_SECONDS (15 by default)
+BACKEND_STREAM_TIMEOUT = float(os.getenv('BACKEND_STREAM_TIMEOUT', 60))
+
+# Reconnection delay suggested to browsers when the backend feed is unavailable
+CHANGES_RETRY_MS = 5000
+
+# Shared connection pool to the backend
+backend = BackendClient(
+    BACKEND_URL,
+    pool_size=int(os.getenv('BACKEND_POOL_SIZE', 20)),
+    retries=int(os.getenv('BACKEND_RETRIES', 2)),
+    backoff=float(os.getenv('BACKEND_RETRY_BACKOFF', 0.2)),
+    connect_timeout=float(os.getenv('BACKEND_CONNECT_TIMEOUT', 2)),
+    read_timeout=float(os.getenv('BACKEND_READ_TIMEOUT', 5)),
+    use_msgpack=os.getenv('BACKEND_MSGPACK', 'true').lower() == 'true',
+    stream_pool_size=int(os.getenv('BACKEND_STREAM_POOL_SIZE', 100)),
+)
+
+# Backend payloads and rendered records pages, keyed by filter combination (and cursor)
+page_cache = TTLCache(
+    maxsize=int(os.getenv('PAGE_CACHE_MAX_SIZE', 64)),
+    ttl=float(os.getenv('PAGE_CACHE_TTL', 10)),
+)
 
 # Categories and record types
 CATEGORIES = ['food', 'car', 'rent']
 RECORD_TYPES = ['income', 'expense']
 
 
+def filter_params(args):
+    """Backend filter parameters from the query string, ignoring unknown values."""
+    params = {}
+    category = args.get('category')
+    record_type = args.get('record_type')
+    if category and category in CATEGORIES:
+        params['category'] = category
+    if record_type and record_type in RECORD_TYPES:
+        params['record_type'] = record_type
+    return params
+
+
+def fetch_records(params, cursor=None, include_items=True, include_summary=True):
+    """
+    Fetch a page of records and the totals for a filter combination.
+    
+    Returns ``(data, summary)``, with ``None`` for a part that was not requested.
+    Parts found in ``page_cache`` are reused; the others are fetched from the
+    backend concurrently.
+    """
+    filters = (params.get('category'), params.get('record_type'))
+    parts = {}
+    if include_items:
+        page_params = {**params, 'limit': PAGE_SIZE, 'fields': ITEM_FIELDS}
+        if cursor:
+            page_params['cursor'] = cursor
+        parts['data'] = (('items', *filters, cursor), (API_ITEMS_PATH, page_params))
+    if include_summary:
+        parts['summary'] = (('summary', *filters), (API_SUMMARY_PATH, params))
+    
+    results = {name: page_cache.get(cache_key) for name, (cache_key, _) in parts.items()}
+    missing = [name for name, value in results.items() if value is None]
+    if missing:
+        responses = backend.get_many(*(parts[name][1] for name in missing))
+        for name, response in zip(missing, responses):
+            response.raise_for_status()
+            results[name] = backend.decode(response)
+            page_cache.set(parts[name][0], results[name])
+    return results.get('data'), results.get('summary')
+
+
+def summary_context(summary):
+    """Template variables for the summary cards."""
+    return {
+        'total_income': float(summary['total_income']),
+        'total_expense': float(summary['total_expense']),
+        'balance': float(summary['balance']),
+    }
+
+
 @app.route('/')
 def index():
-    """Display list of financial records with filtering."""
+    """Display a page of financial records with filtering."""
     # Get filter parameters from query string
     category = request.args.get('category')
     record_type = request.args.get('record_type')
+    cursor = request.args.get('cursor') or None
+    params = filter_params(request.args)
     
-    # Build query parameters
-    params = {}
-    if category and category in CATEGORIES:
-        params['category'] = category
-    if record_type and record_type in RECORD_TYPES:
-        params['record_type'] = record_type
+    # Pages with pending flash messages are rendered fresh and not cached
+    page_key = ('page', params.get('category'), params.get('record_type'), cursor)
+    cacheable_html = not session.get('_flashes')
+    if cacheable_html:
+        html = page_cache.get(page_key)
+        if html is not None:
+            return html
     
     try:
-        # Fetch items from backend API
-        response = requests.get(API_ITEMS_URL, params=params, timeout=5)
-        response.raise_for_status()
-        data = response.json()
-        
-        items = data.get('items', [])
-        total = data.get('total', 0)
-        
-        # Calculate totals
-        total_income = sum(float(item['sum']) for item in items if item['record_type'] == 'income')
-        total_expense = sum(float(item['sum']) for item in items if item['record_type'] == 'expense')
-        balance = total_income - total_expense
-        
-        return render_template(
+        # Only the first page is rendered here; the browser fetches the next ones from /records/rows
+        data, summary = fetch_records(params, cursor)
+        html = render_template(
             'index.html',
-            items=items,
-            total_count=total,
-            total_income=total_income,
-            total_expense=total_expense,
-            balance=balance,
+            items=data.get('items', []),
+            total_count=data.get('total', 0),
+            cursor=cursor,
+            next_cursor=data.get('next_cursor'),
             categories=CATEGORIES,
             record_types=RECORD_TYPES,
-            selected_category=category,
-            selected_record_type=record_type
+            selected_category=params.get('category'),
+            selected_record_type=params.get('record_type'),
+            **summary_context(summary)
         )
+        if cacheable_html:
+            page_cache.set(page_key, html)
+        return html
     except requests.exceptions.ConnectionError:
         flash('Error: Unable to connect to backend API. Please ensure the backend service is running.', 'error')
         return render_template(
@@ -104,6 +192,35 @@ def index():
         )
 
 
+@app.route('/records/rows')
+def records_rows():
+    """
+    Render one page of records as table rows, for infinite scroll and filter changes.
+    
+    The number of matching records and the cursor of the following page (if
+    any) are sent in the ``X-Total-Count`` and ``X-Next-Cursor`` headers.
+    """
+    try:
+        data, _ = fetch_records(filter_params(request.args), request.args.get('cursor') or None, include_summary=False)
+    except requests.exceptions.RequestException:
+        return '', 502
+    
+    headers = {'X-Total-Count': str(data.get('total', 0))}
+    if data.get('next_cursor'):
+        headers['X-Next-Cursor'] = data['next_cursor']
+    return render_template('_rows.html', items=data.get('items', [])), headers
+
+
+@app.route('/records/summary')
+def records_summary():
+    """Render the summary cards for a filter combination."""
+    try:
+        _, summary = fetch_records(filter_params(request.args), include_items=False)
+    except requests.exceptions.RequestException:
+        return '', 502
+    return render_template('_summary.html', **summary_context(summary))
+
+
 @app.route('/create', methods=['GET', 'POST'])
 def create():
     """Create a new financial record."""
@@ -114,6 +231,8 @@ def create():
         category = request.form.get('category')
         record_type = request.form.get('record_type')
         sum_value = request.form.get('sum', '').strip()
+        # Generated with the form, so resubmissions and retries create one record
+        idempotency_key = request.form.get('idempotency_key') or uuid.uuid4().hex
         
         # Validate form data
         errors = []
@@ -163,9 +282,12 @@ def create():
         
         try:
             # Send POST request to backend API
-            response = requests.post(API_ITEMS_URL, json=item_data, timeout=5)
+            response = backend.post(API_ITEMS_PATH, json=item_data, idempotency_key=idempotency_key)
             response.raise_for_status()
             
+            # The new record changes every cached filter combination
+            page_cache.clear()
+            
             flash(f'Successfully created {record_type} record: {name}', 'success')
             return redirect(url_for('index'))
             
@@ -174,6 +296,9 @@ def create():
         except requests.exceptions.Timeout:
             flash('Error: Backend API request timed out. Please try again later.', 'error')
         except requests.exceptions.HTTPError as e:
+            if e.response.status_code < 500:
+                # The backend keeps this answer for the key; a corrected form needs a new one
+                idempotency_key = uuid.uuid4().hex
             if e.response.status_code == 422:
                 # Validation error from backend
                 try:
@@ -199,7 +324,7 @@ def create():
             'create.html',
             categories=CATEGORIES,
             record_types=RECORD_TYPES,
-            form_data=request.form
+            form_data={**request.form.to_dict(), 'idempotency_key': idempotency_key}
         )
     
     # GET request - show form
@@ -207,10 +332,42 @@ def create():
         'create.html',
         categories=CATEGORIES,
         record_types=RECORD_TYPES,
-        form_data={}
+        form_data={'idempotency_key': uuid.uuid4().hex}
     )
 
 
+@app.route('/changes')
+def changes():
+    """Relay the backend's item change feed to the browser as Server-Sent Events."""
+    headers = {'Accept': 'text/event-stream'}
+    last_event_id = request.headers.get('Last-Event-ID')
+    if last_event_id:
+        headers['Last-Event-ID'] = last_event_id
+    stream_headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    
+    try:
+        response = backend.stream(API_CHANGES_PATH, headers=headers, read_timeout=BACKEND_STREAM_TIMEOUT)
+        response.raise_for_status()
+    except requests.exceptions.RequestException:
+        # EventSource gives up on error responses; an empty stream makes it retry later
+        return Response(f'retry: {CHANGES_RETRY_MS}\n\n', mimetype='text/event-stream', headers=stream_headers)
+    
+    def relay():
+        try:
+            for chunk in response.iter_content(chunk_size=None):
+                if b'event:' in chunk:
+                    # Records changed, so the cached pages are stale
+                    page_cache.clear()
+                yield chunk
+        except requests.exceptions.RequestException:
+            # The browser reconnects and resumes with Last-Event-ID
+            pass
+        finally:
+            response.close()
+    
+    return Response(relay(), mimetype='text/event-stream', headers=stream_headers)
+
+
 @app.route('/health')
 def health():
     """Health check endpoint."""
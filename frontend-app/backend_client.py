@@ -0,0 +1,144 @@
+"""Pooled HTTP client for the backend API."""
+import time
+from concurrent.futures import ThreadPoolExecutor
+import msgpack
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from metrics import BACKEND_REQUEST_DURATION
+
+MSGPACK_MEDIA_TYPE = 'application/msgpack'
+
+# Responses after which a request is retried
+RETRY_STATUSES = (502, 503, 504)
+
+
+class BackendClient:
+    """Shared keep-alive session to the backend with bounded retries.
+    
+    One instance is created per process and used by all requests, so TCP
+    connections to the backend are reused instead of opened per call.
+    Idempotent requests that fail to connect or get a 502/503/504 are
+    retried with exponential backoff (or after the backend's ``Retry-After``).
+    POSTs are only retried when sent with an idempotency key.
+    Every request tells the backend how long it will wait for the response
+    (``X-Request-Timeout-Ms``), so the backend can shed it instead of queueing
+    it past that point.
+    
+    Streaming responses (:meth:`stream`) stay open for minutes, so they use
+    a separate pool of ``stream_pool_size`` connections and never hold a
+    connection that regular calls could reuse.
+    
+    With ``use_msgpack`` set, responses are requested as MessagePack where the
+    backend supports it; :meth:`decode` reads either format. Compressed
+    responses (gzip, and brotli/zstd when those packages are installed) are
+    negotiated and decoded by ``requests`` itself.
+    """
+    
+    def __init__(self, base_url, pool_size=20, retries=2, backoff=0.2, connect_timeout=2.0, read_timeout=5.0,
+                 use_msgpack=True, stream_pool_size=100):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({'GET', 'HEAD'}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['X-Request-Timeout-Ms'] = str(int(read_timeout * 1000))
+        if use_msgpack:
+            self.session.headers['Accept'] = f'{MSGPACK_MEDIA_TYPE}, application/json;q=0.9'
+        
+        stream_adapter = HTTPAdapter(pool_connections=1, pool_maxsize=stream_pool_size)
+        self.stream_session = requests.Session()
+        self.stream_session.mount('http://', stream_adapter)
+        self.stream_session.mount('https://', stream_adapter)
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix='backend')
+    
+    def request(self, method, path, session=None, **kwargs):
+        """Send a request to the backend, applying the default timeouts and recording its latency."""
+        kwargs.setdefault('timeout', self.timeout)
+        start = time.perf_counter()
+        status = 'error'
+        try:
+            response = (session or self.session).request(method, f"{self.base_url}{path}", **kwargs)
+            status = response.status_code
+            return response
+        finally:
+            BACKEND_REQUEST_DURATION.labels(method, path, status).observe(time.perf_counter() - start)
+    
+    @staticmethod
+    def decode(response):
+        """Decode a MessagePack or JSON response body."""
+        if response.headers.get('Content-Type', '').startswith(MSGPACK_MEDIA_TYPE):
+            return msgpack.unpackb(response.content)
+        return response.json()
+    
+    def get(self, path, **kwargs):
+        """Send a GET request to the backend."""
+        return self.request('GET', path, **kwargs)
+    
+    def stream(self, path, headers=None, read_timeout=None):
+        """
+        Open a streaming GET request, e.g. to an event stream.
+        
+        ``read_timeout`` bounds the wait for each chunk rather than the whole
+        response. The caller must close the returned response, which returns
+        its connection to the streaming pool.
+        """
+        return self.request(
+            'GET',
+            path,
+            session=self.stream_session,
+            headers=headers,
+            stream=True,
+            timeout=(self.timeout[0], read_timeout)
+        )
+    
+    def post(self, path, idempotency_key=None, **kwargs):
+        """
+        Send a POST request to the backend.
+        
+        With ``idempotency_key``, the request carries an ``Idempotency-Key``
+        header and is retried like a GET, including after read timeouts: the
+        backend answers a repeat with the original response instead of
+        creating a second record.
+        """
+        if idempotency_key is None:
+            return self.request('POST', path, **kwargs)
+        
+        kwargs['headers'] = {**kwargs.get('headers', {}), 'Idempotency-Key': idempotency_key}
+        for attempt in range(self.retries + 1):
+            last_attempt = attempt == self.retries
+            delay = self.backoff * 2 ** attempt
+            try:
+                response = self.request('POST', path, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if last_attempt:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or last_attempt:
+                    return response
+                retry_after = response.headers.get('Retry-After', '')
+                if retry_after.isdigit():
+                    delay = int(retry_after)
+            time.sleep(delay)
+    
+    def get_many(self, *calls):
+        """
+        Send several GET requests concurrently.
+        
+        Each call is a ``(path, params)`` tuple. Responses are returned in the
+        same order; the first exception raised by any call is re-raised.
+        """
+        futures = [self._executor.submit(self.get, path, params=params) for path, params in calls]
+        return [future.result() for future in futures]
@@ -0,0 +1,48 @@
+"""Prometheus metrics for the frontend."""
+import time
+from flask import Response, g, request
+from prometheus_client import CONTENT_TYPE_LATEST, Gauge, Histogram, generate_latest
+
+REQUEST_DURATION = Histogram(
+    'frontend_http_request_duration_seconds',
+    'Frontend request latency by endpoint',
+    ['method', 'endpoint', 'status'],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    'frontend_http_requests_in_progress',
+    'Frontend requests currently being handled by endpoint',
+    ['method', 'endpoint'],
+)
+BACKEND_REQUEST_DURATION = Histogram(
+    'frontend_backend_request_duration_seconds',
+    'Latency of calls from the frontend to the backend API, including retries',
+    ['method', 'path', 'status'],
+)
+
+
+def init_app(app):
+    """Record request metrics for ``app`` and serve them at ``/metrics``."""
+    
+    @app.before_request
+    def start_timer():
+        g.metrics_endpoint = request.endpoint or 'unmatched'
+        g.metrics_start = time.perf_counter()
+        REQUESTS_IN_PROGRESS.labels(request.method, g.metrics_endpoint).inc()
+    
+    @app.after_request
+    def record_request(response):
+        if 'metrics_start' in g:
+            REQUEST_DURATION.labels(request.method, g.metrics_endpoint, response.status_code).observe(
+                time.perf_counter() - g.metrics_start
+            )
+        return response
+    
+    @app.teardown_request
+    def finish_request(exc):
+        if 'metrics_start' in g:
+            REQUESTS_IN_PROGRESS.labels(request.method, g.metrics_endpoint).dec()
+    
+    @app.route('/metrics')
+    def metrics():
+        """Prometheus metrics."""
+        return Response(generate_latest(), headers={'Content-Type': CONTENT_TYPE_LATEST})